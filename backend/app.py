@@ -1,15 +1,42 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import logging
 import json
 import asyncio
-import base64
-import numpy as np
-import cv2
 import os
+import time
 from typing import Dict
-from services.gesture_recognition import GestureRecognizer
+from services.code_cache import CodeCache
 from services.code_generator import CodeGenerator
+from services.batch_scheduler import BatchScheduler
+from services.frame_executor import FrameExecutor, decode_and_detect, decode_and_gate, detect_batch
+from services.frame_recorder import FrameRecorder
+from services.recognizer_registry import (
+    available_recognizers,
+    is_batched,
+    is_registered,
+    loaded_recognizers,
+    release_recognizer_session,
+)
+from services.session_registry import RecognitionSession, SessionRegistry
+from services import metrics
+from services.metrics import (
+    CODE_GENERATIONS_SUPERSEDED,
+    FRAMES_DROPPED,
+    FRAMES_MOTION_SKIPPED,
+    FRAMES_RECEIVED,
+    FRAMES_RECOGNIZED,
+    GESTURES_COMMITTED,
+    STAGE_LATENCY,
+)
+from services.frame_protocol import (
+    FrameProtocolError,
+    PROTOCOL_JSON,
+    SUPPORTED_PROTOCOLS,
+    parse_binary_frame,
+    parse_json_frame,
+)
 
 # Configure logging and load environment variables
 logging.basicConfig(level=logging.DEBUG)
@@ -18,12 +45,98 @@ logger = logging.getLogger(__name__)
 app = FastAPI()
 
 # Initialize services
-gesture_recognizer = GestureRecognizer()
-code_generator = CodeGenerator(os.getenv('OPENAI_API_KEY'))
+# Sequences of known gestures are composed locally from the code templates (CODE_LOCAL_SYNTHESIS=0
+# sends everything to the LLM). LLM results are cached per (gesture sequence, language, prompt
+# version); set CODE_CACHE_PATH to keep them in a SQLite file across restarts, or
+# CODE_CACHE_SIZE=0 to disable caching
+CODE_CACHE_SIZE = int(os.getenv('CODE_CACHE_SIZE', '256'))
+code_generator = CodeGenerator(
+    os.getenv('OPENAI_API_KEY'),
+    cache=CodeCache(
+        max_entries=CODE_CACHE_SIZE,
+        ttl=float(os.getenv('CODE_CACHE_TTL', '86400')),
+        path=os.getenv('CODE_CACHE_PATH')
+    ) if CODE_CACHE_SIZE > 0 else None,
+    local_synthesis=os.getenv('CODE_LOCAL_SYNTHESIS', '1') != '0'
+)
+# LLM code is streamed to the client as "code_delta" messages before the final "code" message
+# (CODE_STREAMING=0 sends only the final message)
+CODE_STREAMING = os.getenv('CODE_STREAMING', '1') != '0'
+
+# Decode and recognition run on a pool so one slow frame can't stall the event loop
+frame_executor = FrameExecutor(
+    mode=os.getenv('FRAME_EXECUTOR', 'thread'),
+    max_workers=int(os.getenv('FRAME_EXECUTOR_WORKERS', '0')) or None
+)
+
+# For backends that benefit (e.g. the CNN), frames from all sessions are decoded one per worker and
+# then micro-batched into one recognizer call; a batch size of 1 disables it
+FRAME_BATCH_SIZE = int(os.getenv('FRAME_BATCH_SIZE', '8'))
+frame_batcher = BatchScheduler(
+    detect_batch,
+    frame_executor,
+    max_batch_size=FRAME_BATCH_SIZE,
+    max_wait_ms=float(os.getenv('FRAME_BATCH_WAIT_MS', '2'))
+) if FRAME_BATCH_SIZE > 1 else None
+
+# Per-user recognition state, created on first connect and evicted once idle
+session_registry = SessionRegistry(
+    idle_timeout=float(os.getenv('SESSION_IDLE_TIMEOUT', '300')),
+    max_sequence_length=int(os.getenv('MAX_SEQUENCE_LENGTH', '5')),
+    # Maximum frames waiting to be processed per session; older frames are dropped
+    frame_queue_size=int(os.getenv('FRAME_QUEUE_SIZE', '1')),
+    # Mean absolute thumbnail difference (0-255) below which a frame counts as static; 0 disables gating
+    motion_threshold=float(os.getenv('MOTION_THRESHOLD', '4')),
+    # Consistent frames needed before a gesture is committed, and minimum time between commits
+    hysteresis_frames=int(os.getenv('GESTURE_HYSTERESIS_FRAMES', '3')),
+    debounce_ms=float(os.getenv('GESTURE_DEBOUNCE_MS', '500'))
+)
+
+# Recognition backend used unless a connection asks for another with ?recognizer=<name>
+RECOGNIZER_BACKEND = os.getenv('RECOGNIZER_BACKEND', 'brightness')
+
+# Opt-in: when set, every session's incoming frames are recorded here for offline replay
+FRAME_RECORD_DIR = os.getenv('FRAME_RECORD_DIR')
 
 # Store active connections
 active_connections: Dict[str, WebSocket] = {}
 
+metrics.register_gauge(
+    'sign_language_active_connections',
+    'Open sign-language WebSocket connections',
+    lambda: len(active_connections)
+)
+metrics.register_gauge(
+    'sign_language_sessions',
+    'Recognition sessions held in memory',
+    lambda: len(session_registry)
+)
+
+metrics.register_gauge(
+    'code_generator_cache_entries',
+    'Generated code results held in the in-memory cache',
+    lambda: len(code_generator.cache) if code_generator.cache is not None else 0
+)
+
+metrics.register_gauge(
+    'sign_language_motion_threshold',
+    'Frame difference below which recognition is skipped',
+    lambda: session_registry.motion_threshold
+)
+metrics.register_gauge(
+    'sign_language_motion_skip_ratio',
+    'Share of received frames that skipped recognition as static',
+    lambda: FRAMES_MOTION_SKIPPED.labels().value / max(1.0, FRAMES_RECEIVED.labels().value)
+)
+
+# Stage timers, resolved once so the hot path skips the label lookup
+BASE64_DECODE_LATENCY = STAGE_LATENCY.labels('base64_decode')
+IMDECODE_LATENCY = STAGE_LATENCY.labels('imdecode')
+MOTION_GATE_LATENCY = STAGE_LATENCY.labels('motion_gate')
+PROCESS_FRAME_LATENCY = STAGE_LATENCY.labels('process_frame')
+GENERATE_CODE_LATENCY = STAGE_LATENCY.labels('generate_code')
+SEND_JSON_LATENCY = STAGE_LATENCY.labels('send_json')
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -37,72 +150,266 @@ app.add_middleware(
 async def root():
     return {"status": "Server is running"}
 
+@app.on_event("startup")
+async def start_session_eviction():
+    app.state.session_eviction = asyncio.create_task(session_registry.run_eviction())
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    app.state.session_eviction.cancel()
+    if frame_batcher is not None:
+        await frame_batcher.close()
+    frame_executor.shutdown()
+    if code_generator.cache is not None:
+        code_generator.cache.close()
+
+async def push_generated_code(websocket: WebSocket, user_id: str, generation: int, result: Dict, language: str):
+    """Generate code for a committed sequence in the background and push it to the client"""
+    async def send_delta(delta: str):
+        await websocket.send_json({
+            "type": "code_delta",
+            "generation": generation,
+            "delta": delta
+        })
+
+    try:
+        start = time.perf_counter()
+        code_result = await code_generator.generate_code(
+            result['gesture_sequence'],
+            language=language,
+            on_delta=send_delta if CODE_STREAMING else None
+        )
+        GENERATE_CODE_LATENCY.observe(time.perf_counter() - start)
+        
+        with SEND_JSON_LATENCY.time():
+            await websocket.send_json({
+                "type": "code",
+                "done": True,
+                "generation": generation,
+                "sequence": result.get('sequence'),
+                "gesture_name": result['gesture_name'],
+                "gesture_sequence": result['gesture_sequence'],
+                "confidence": result['confidence'],
+                **code_result
+            })
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating code for {user_id}: {str(e)}")
+        try:
+            await websocket.send_json({
+                "type": "code",
+                "done": True,
+                "generation": generation,
+                "sequence": result.get('sequence'),
+                "status": "error",
+                "error": f"Failed to generate code: {str(e)}",
+                "code": None
+            })
+        except Exception:
+            pass
+
+async def process_frames(websocket: WebSocket, user_id: str, session: RecognitionSession):
+    """Consume queued frames for one connection, offloading CPU work to the executor"""
+    frame_queue = session.frame_queue
+    while True:
+        frame = await frame_queue.get()
+        try:
+            # Decode and classify off the event loop, batched with other sessions when enabled,
+            # and skipping recognition entirely when nothing moved since the last recognized frame
+            job = {
+                "payload": frame["payload"],
+                "recognizer": session.backend,
+                "session": session.session_id,
+                "reference": session.motion_gate.reference,
+                "motion_threshold": session.motion_gate.threshold
+            }
+            if frame_batcher is not None and is_batched(session.backend):
+                # Decode and gate on the pool per frame; only the recognizer call is batched
+                detection = await frame_executor.run(decode_and_gate, job, key=session.session_id)
+                frame_data = detection.pop('frame')
+                if detection['moved']:
+                    recognized = await frame_batcher.submit({
+                        "frame": frame_data,
+                        "recognizer": session.backend,
+                        "session": session.session_id
+                    }, key=session.session_id)
+                    detection['gesture'] = recognized['gesture']
+                    detection['timings']['process_frame'] = recognized['process_frame']
+            else:
+                detection = await frame_executor.run(decode_and_detect, job, key=session.session_id)
+            timings = detection['timings']
+            IMDECODE_LATENCY.observe(timings['imdecode'])
+            MOTION_GATE_LATENCY.observe(timings['motion_gate'])
+            session.motion_gate.update(detection['moved'], detection['thumbnail'])
+            if detection['moved']:
+                PROCESS_FRAME_LATENCY.observe(timings['process_frame'])
+                gesture = detection['gesture']
+                # Only frames the recognizer actually ran on count; skipped frames reuse the last gesture
+                if gesture is not None:
+                    FRAMES_RECOGNIZED.inc()
+            else:
+                # Nothing moved, so the previous frame's gesture still holds
+                FRAMES_MOTION_SKIPPED.inc()
+                gesture = session.gesture_state.last_observed
+            
+            # Push a new capture rate to the client when this session is over- or under-loaded
+            rate_update = session.rate_controller.observe(
+                time.monotonic() - frame["received_at"],
+                frame_queue.dropped,
+                queue_depth=len(frame_queue)
+            )
+            if rate_update is not None:
+                await websocket.send_json(rate_update)
+            
+            
+            # Only committed gesture transitions reach the sequence and the code generator;
+            # a held gesture commits once instead of on every frame
+            committed = session.gesture_state.observe(gesture)
+            if committed is None:
+                continue
+            GESTURES_COMMITTED.inc()
+            session.touch()
+            result = session.recognizer.record_gesture(committed, language=frame["language"])
+            if frame["sequence"] is not None:
+                result['sequence'] = frame["sequence"]
+            
+            # Code for the previous sequence is stale now; its generation is cancelled
+            if session.cancel_code_generation():
+                CODE_GENERATIONS_SUPERSEDED.inc()
+            session.code_generation += 1
+            result['generation'] = session.code_generation
+            result['code_status'] = 'pending'
+            
+            # Send the gesture right away; code follows in a "code" message with the same generation
+            with SEND_JSON_LATENCY.time():
+                await websocket.send_json(result)
+            session.code_task = asyncio.create_task(
+                push_generated_code(websocket, user_id, session.code_generation, result, frame["language"])
+            )
+        except WebSocketDisconnect:
+            break
+        except Exception as e:
+            logger.error(f"Error processing frame for {user_id}: {str(e)}")
+            try:
+                await websocket.send_json({
+                    "status": "error",
+                    "message": f"Failed to process frame: {str(e)}"
+                })
+            except Exception:
+                break
+        finally:
+            frame_queue.task_done()
+
 @app.websocket("/ws/sign-language/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
+    session = None
+    processor = None
+    recorder = None
     try:
         await websocket.accept()
-        active_connections[user_id] = websocket
-        logger.info(f"WebSocket connection accepted for {user_id}")
+        backend = websocket.query_params.get("recognizer", RECOGNIZER_BACKEND)
+        if not is_registered(backend):
+            await websocket.send_json({
+                "status": "error",
+                "message": f"Unknown recognizer '{backend}'",
+                "recognizers": available_recognizers()
+            })
+            return
+        # One session per connection; a client may resume its own detached session after a reconnect
+        session = session_registry.attach(user_id, resume=websocket.query_params.get("session"))
+        session.backend = backend
+        active_connections[session.session_id] = websocket
+        frame_queue = session.frame_queue
+        logger.info(f"WebSocket connection accepted for {user_id} (session {session.session_id})")
         
         # Send initial success message
         await websocket.send_json({
             "status": "connected",
-            "message": "Connected successfully"
+            "message": "Connected successfully",
+            "protocols": SUPPORTED_PROTOCOLS,
+            "recognizer": backend,
+            "session": session.session_id
         })
         
         # Keep track of continuous recognition state
         is_recognizing = False
+        protocol = PROTOCOL_JSON
+        processor = asyncio.create_task(process_frames(websocket, user_id, session))
         
         while True:
             try:
-                # Wait for client message
-                data = await websocket.receive_json()
-                logger.debug(f"Received message from {user_id}")
-                
-                if data.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
-                    continue
+                # Wait for client message; frames may arrive as binary or JSON text
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
                 
-                if data.get("type") == "start_recognition":
-                    is_recognizing = True
-                    await websocket.send_json({
-                        "status": "success",
-                        "message": "Recognition started"
-                    })
-                    continue
+                if message.get("bytes") is not None:
+                    if not is_recognizing:
+                        continue
+                    frame = parse_binary_frame(message["bytes"])
+                else:
+                    data = json.loads(message["text"])
+                    logger.debug(f"Received message from {user_id}")
                     
-                if data.get("type") == "stop_recognition":
-                    is_recognizing = False
-                    await websocket.send_json({
-                        "status": "success",
-                        "message": "Recognition stopped"
-                    })
-                    continue
-                
-                if data.get("frame") and is_recognizing:
-                    # Decode base64 frame
-                    frame_data = base64.b64decode(data["frame"].split(',')[1])
-                    frame_arr = np.frombuffer(frame_data, np.uint8)
-                    frame = cv2.imdecode(frame_arr, cv2.IMREAD_COLOR)
-                    
-                    # Process frame
-                    result = gesture_recognizer.process_frame(frame)
+                    if data.get("type") == "ping":
+                        await websocket.send_json({"type": "pong"})
+                        continue
                     
-                    # Only send meaningful updates
-                    if result['status'] == 'success' and result['gesture_name'] != 'NO_GESTURE':
-                        # Generate code if needed
-                        code_result = await code_generator.generate_code(
-                            result['gesture_sequence'],
-                            language=data.get("language", "javascript")
-                        )
-                        result.update(code_result)
+                    if data.get("type") == "start_recognition":
+                        is_recognizing = True
+                        requested = data.get("protocol", PROTOCOL_JSON)
+                        protocol = requested if requested in SUPPORTED_PROTOCOLS else PROTOCOL_JSON
+                        if FRAME_RECORD_DIR and recorder is None:
+                            recorder = FrameRecorder.for_session(FRAME_RECORD_DIR, session.session_id)
+                            logger.info(f"Recording frames for {user_id} to {recorder.path}")
+                        await websocket.send_json({
+                            "status": "success",
+                            "message": "Recognition started",
+                            "protocol": protocol
+                        })
+                        await websocket.send_json(session.rate_controller.control_message())
+                        continue
                         
-                        # Send result
-                        await websocket.send_json(result)
+                    if data.get("type") == "get_stats":
+                        await websocket.send_json({"type": "stats", **session.stats()})
+                        continue
+                    
+                    if data.get("type") == "stop_recognition":
+                        is_recognizing = False
+                        FRAMES_DROPPED.inc(frame_queue.clear())
+                        session.motion_gate.reset()
+                        session.gesture_state.reset()
+                        session.cancel_code_generation()
+                        await websocket.send_json({
+                            "status": "success",
+                            "message": "Recognition stopped"
+                        })
+                        continue
+                    
+                    if not (data.get("frame") and is_recognizing):
+                        continue
+                    with BASE64_DECODE_LATENCY.time():
+                        frame = parse_json_frame(data)
+                
+                frame["received_at"] = time.monotonic()
+                FRAMES_RECEIVED.inc()
+                if recorder is not None:
+                    recorder.submit(frame)
+                
+                # Hand the frame to the processing task; the loop itself only does I/O.
+                # A full queue drops its stalest frame so the newest one always wins.
+                FRAMES_DROPPED.inc(frame_queue.put(frame))
                 
             except WebSocketDisconnect:
                 logger.info(f"Client {user_id} disconnected")
                 break
+            except (FrameProtocolError, json.JSONDecodeError) as e:
+                logger.warning(f"Invalid message from {user_id}: {str(e)}")
+                await websocket.send_json({
+                    "status": "error",
+                    "message": f"Invalid message: {str(e)}"
+                })
             except Exception as e:
                 logger.error(f"Error processing message: {str(e)}")
                 await websocket.send_json({
@@ -113,12 +420,57 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
     finally:
-        active_connections.pop(user_id, None)
+        if processor is not None:
+            processor.cancel()
+        if session is not None:
+            session.cancel_code_generation()
+        if recorder is not None:
+            await recorder.aclose()
+            if recorder.dropped:
+                logger.warning(f"Recording for {user_id} dropped {recorder.dropped} frames")
+        if session is not None:
+            session_registry.detach(session)
+            if session.connections == 0:
+                # Free per-session recognizer state (e.g. a pooled MediaPipe graph) in the
+                # worker that holds it
+                try:
+                    await frame_executor.run(release_recognizer_session, session.backend, session.session_id,
+                                             key=session.session_id)
+                except Exception as e:
+                    logger.warning(f"Failed to release recognizer session {user_id}: {e}")
+        if session is not None:
+            active_connections.pop(session.session_id, None)
         try:
             await websocket.close()
         except:
             pass
 
+@app.get("/sessions")
+async def session_stats():
+    stats = session_registry.stats()
+    if frame_batcher is not None:
+        stats['batching'] = frame_batcher.stats()
+    return stats
+
+@app.get("/code-cache")
+async def code_cache_stats():
+    if code_generator.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **code_generator.cache.stats()}
+
+@app.get("/recognizers")
+async def recognizers():
+    return {
+        "available": available_recognizers(),
+        "default": RECOGNIZER_BACKEND,
+        # Only backends loaded in this process; process-pool workers load their own
+        "loaded": loaded_recognizers()
+    }
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"} 
\ No newline at end of file
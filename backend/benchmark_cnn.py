@@ -0,0 +1,130 @@
+"""Compare serving engines for the gesture CNN.
+
+Runs the same inputs through Keras ``model.predict`` and the TFLite exports
+written by GestureModelTrainer.export_tflite() (float and int8), each in its
+own process so load time and resident memory are measured in isolation:
+
+    python benchmark_cnn.py --model-dir data/gestures --batch-sizes 1 8 32
+
+Reports load time, peak RSS, per-batch latency percentiles, throughput and
+how often each engine agrees with Keras on the top-1 class.
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import time
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+from services.cnn_recognition import DEFAULT_MODEL_DIR, MODEL_INPUT_SIZE
+
+ENGINES = {
+    'keras': 'gesture_model.h5',
+    'tflite': 'gesture_model.tflite',
+    'tflite_int8': 'gesture_model_int8.tflite'
+}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_engine(engine: str, model_dir: Path, num_threads: int):
+    """Return a predict(batch) -> probabilities callable for one engine"""
+    if engine == 'keras':
+        import tensorflow as tf
+        model = tf.keras.models.load_model(model_dir / ENGINES[engine])
+        return lambda batch: model.predict(batch, batch_size=len(batch), verbose=0)
+
+    from services.cnn_recognition import TFLiteGestureRecognizer
+    recognizer = TFLiteGestureRecognizer(str(model_dir), ENGINES[engine], num_threads=num_threads)
+    return recognizer.predict
+
+
+def run_engine(engine: str, model_dir: Path, inputs: np.ndarray, batch_sizes: List[int],
+               iterations: int, num_threads: int, results):
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+    predict = load_engine(engine, model_dir, num_threads)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    report = {
+        'engine': engine,
+        'load_ms': round(load_ms, 1),
+        'batches': {},
+        'top1': np.argmax(predict(inputs), axis=1).tolist()
+    }
+    for batch_size in batch_sizes:
+        batch = inputs[:batch_size]
+        predict(batch)  # warm up this input shape
+        latencies = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            predict(batch)
+            latencies.append(time.perf_counter() - t0)
+
+        values = np.array(latencies) * 1000
+        p50, p95 = np.percentile(values, [50, 95])
+        report['batches'][batch_size] = {
+            'p50_ms': round(float(p50), 3),
+            'p95_ms': round(float(p95), 3),
+            'frames_per_s': round(batch_size * iterations / sum(latencies), 1)
+        }
+    report['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    report['model_rss_mb'] = round(report['peak_rss_mb'] - baseline_rss, 1)
+    results.put(report)
+
+
+def benchmark(model_dir: Path, engines: List[str], batch_sizes: List[int], iterations: int,
+              num_threads: int) -> List[Dict]:
+    rng = np.random.default_rng(0)
+    inputs = rng.random((max(batch_sizes), MODEL_INPUT_SIZE[1], MODEL_INPUT_SIZE[0], 1), dtype=np.float32)
+
+    # A fresh interpreter per engine keeps memory readings independent
+    context = multiprocessing.get_context('spawn')
+    reports = []
+    for engine in engines:
+        if not (model_dir / ENGINES[engine]).exists():
+            print(f"Skipping {engine}: {model_dir / ENGINES[engine]} not found")
+            continue
+        results = context.Queue()
+        process = context.Process(target=run_engine, args=(
+            engine, model_dir, inputs, batch_sizes, iterations, num_threads, results))
+        process.start()
+        reports.append(results.get())
+        process.join()
+
+    reference = next((r['top1'] for r in reports if r['engine'] == 'keras'), None)
+    for report in reports:
+        top1 = report.pop('top1')
+        if reference is not None:
+            report['top1_agreement'] = round(float(np.mean(np.array(top1) == np.array(reference))), 3)
+    return reports
+
+
+def print_report(reports: List[Dict]):
+    print(f"{'engine':<12} {'load ms':>8} {'rss MB':>7} {'batch':>6} {'p50 ms':>8} {'p95 ms':>8} {'frames/s':>9}")
+    for report in reports:
+        for batch_size, stats in report['batches'].items():
+            print(f"{report['engine']:<12} {report['load_ms']:>8} {report['model_rss_mb']:>7} {batch_size:>6} "
+                  f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['frames_per_s']:>9}")
+        if 'top1_agreement' in report:
+            print(f"{report['engine']:<12} top-1 agreement with keras: {report['top1_agreement']:.1%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark gesture CNN serving engines')
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR)
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=1, help='TFLite interpreter threads')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    reports = benchmark(Path(args.model_dir), args.engines, args.batch_sizes, args.iterations, args.threads)
+    print_report(reports)
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2))
@@ -0,0 +1,231 @@
+"""Load generator and latency benchmark for /ws/sign-language/{user_id}.
+
+Spins up N synthetic signers that stream JPEG frames at a fixed rate using the
+regular start_recognition protocol, then reports throughput and end-to-end
+latency percentiles. The server only answers frames that commit a gesture, so
+latency is measured from those frames to their gesture result and to its
+generated code; dropped, motion-skipped and held frames are not timed. By
+default the backend is started in-process with the OpenAI call replaced by a
+local stub, so the benchmark runs offline:
+
+    python benchmark_websocket.py --clients 50 --fps 5 --duration 30
+
+Pass --url to benchmark an already running server instead.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+import cv2
+import numpy as np
+import websockets
+from services.frame_protocol import encode_binary_frame
+
+
+class StubCodeGenerator:
+    """Stands in for CodeGenerator with a fixed simulated LLM latency"""
+
+    # No code cache; app.py's cache gauge, /code-cache and shutdown check for None
+    cache = None
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000.0
+
+    async def generate_code(self, gesture_sequence: list, language: str = 'javascript',
+                            on_delta: Optional[Callable[[str], Awaitable]] = None) -> Dict:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        code = f"// {' '.join(gesture_sequence)}"
+        if on_delta is not None:
+            # Streamed as a single fragment, like a one-token completion
+            await on_delta(code)
+        return {
+            'status': 'success',
+            'code': code,
+            'language': language
+        }
+
+
+def synthetic_frames(count: int, width: int, height: int, quality: int = 50) -> List[bytes]:
+    """Encode frames with varying brightness and noise so every gesture class shows up"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        level = int(255 * i / max(1, count - 1))
+        image = np.full((height, width, 3), level, np.uint8)
+        noise = rng.integers(-20, 20, size=image.shape, dtype=np.int16)
+        image = np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            frames.append(encoded.tobytes())
+    return frames
+
+
+def load_frames(frames_dir: Path) -> List[bytes]:
+    """Load recorded JPEG/WebP frames from a directory"""
+    paths = sorted(p for p in frames_dir.iterdir() if p.suffix.lower() in ('.jpg', '.jpeg', '.webp'))
+    return [p.read_bytes() for p in paths]
+
+
+class ClientStats:
+    def __init__(self):
+        self.sent = 0
+        self.results = 0
+        self.errors = 0
+        # Only frames that commit a gesture get a result, so these cover commit frames alone
+        self.latencies: List[float] = []
+        # Frame sent to its generated code arriving; superseded generations never get code
+        self.code_results = 0
+        self.code_latencies: List[float] = []
+
+
+async def run_client(url: str,
+                     frames: List[bytes],
+                     fps: float,
+                     duration: float,
+                     protocol: str,
+                     language: str) -> ClientStats:
+    stats = ClientStats()
+    send_times: Dict[int, float] = {}
+    encoded_frames = None
+    if protocol == 'json':
+        encoded_frames = ['data:image/jpeg;base64,' + base64.b64encode(f).decode() for f in frames]
+
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.recv()  # connected
+        await ws.send(json.dumps({'type': 'start_recognition', 'protocol': protocol}))
+
+        # Send time of the frame that committed each generation, until its code arrives
+        pending_code: Dict[int, float] = {}
+
+        async def receive():
+            async for message in ws:
+                data = json.loads(message)
+                if data.get('type') == 'code':
+                    sent_at = pending_code.pop(data.get('generation'), None)
+                    if data.get('status') == 'error':
+                        stats.errors += 1
+                    elif sent_at is not None:
+                        stats.code_latencies.append(time.perf_counter() - sent_at)
+                        stats.code_results += 1
+                    continue
+
+                sequence = data.get('sequence')
+                if sequence is not None and sequence in send_times:
+                    sent_at = send_times.pop(sequence)
+                    stats.latencies.append(time.perf_counter() - sent_at)
+                    stats.results += 1
+                    if data.get('generation') is not None:
+                        pending_code[data['generation']] = sent_at
+                elif data.get('status') == 'error':
+                    stats.errors += 1
+
+        receiver = asyncio.create_task(receive())
+        interval = 1.0 / fps
+        start = time.perf_counter()
+        sequence = 0
+        while time.perf_counter() - start < duration:
+            index = sequence % len(frames)
+            send_times[sequence] = time.perf_counter()
+            if protocol == 'binary':
+                await ws.send(encode_binary_frame(frames[index], sequence, language, time.time() * 1000))
+            else:
+                await ws.send(json.dumps({'frame': encoded_frames[index], 'sequence': sequence, 'language': language}))
+            stats.sent += 1
+            sequence += 1
+            next_send = start + sequence * interval
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+
+        # Give in-flight frames a moment to come back
+        await asyncio.sleep(min(1.0, interval * 2))
+        await ws.send(json.dumps({'type': 'stop_recognition'}))
+        receiver.cancel()
+
+    return stats
+
+
+async def start_local_server(port: int, llm_latency_ms: float):
+    import uvicorn
+    import app as backend_app
+
+    # Replace the OpenAI-backed generator so the benchmark needs no network
+    backend_app.code_generator = StubCodeGenerator(llm_latency_ms)
+
+    server = uvicorn.Server(uvicorn.Config(backend_app.app, host='127.0.0.1', port=port, log_level='warning'))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+def report(results: List[ClientStats], elapsed: float):
+    latencies = np.array([latency for stats in results for latency in stats.latencies]) * 1000
+    code_latencies = np.array([latency for stats in results for latency in stats.code_latencies]) * 1000
+    sent = sum(stats.sent for stats in results)
+    received = sum(stats.results for stats in results)
+    code_received = sum(stats.code_results for stats in results)
+    errors = sum(stats.errors for stats in results)
+
+    print(f"clients:        {len(results)}")
+    print(f"frames sent:    {sent} ({sent / elapsed:.1f}/s)")
+    print(f"results:        {received} ({received / elapsed:.1f}/s)")
+    # Dropped, static and non-committing frames get no result message
+    print(f"no result:      {sent - received} ({100 * (sent - received) / max(1, sent):.1f}%)")
+    # Generations superseded by a newer gesture before their code arrived get no code message
+    print(f"code results:   {code_received} ({received - code_received} superseded or pending)")
+    print(f"errors:         {errors}")
+    for label, values in (('commit', latencies), ('code', code_latencies)):
+        if values.size:
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            print(f"{label + ' ms:':<16}p50={p50:.1f} p95={p95:.1f} p99={p99:.1f} max={values.max():.1f}")
+
+
+async def main(args: argparse.Namespace):
+    if args.frames_dir:
+        frames = load_frames(Path(args.frames_dir))
+    else:
+        frames = synthetic_frames(args.synthetic_frames, args.width, args.height)
+    if not frames:
+        raise SystemExit('No frames to send')
+
+    server: Optional[object] = None
+    server_task = None
+    url = args.url
+    if url is None:
+        server, server_task = await start_local_server(args.port, args.llm_latency_ms)
+        url = f'ws://127.0.0.1:{args.port}/ws/sign-language'
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        run_client(f'{url}/bench-{i}', frames, args.fps, args.duration, args.protocol, args.language)
+        for i in range(args.clients)
+    ])
+    report(results, time.perf_counter() - start)
+
+    if server is not None:
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the sign-language WebSocket endpoint')
+    parser.add_argument('--clients', type=int, default=10, help='number of concurrent synthetic signers')
+    parser.add_argument('--fps', type=float, default=5.0, help='frames per second per client')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds each client streams for')
+    parser.add_argument('--protocol', choices=['binary', 'json'], default='binary')
+    parser.add_argument('--language', default='javascript')
+    parser.add_argument('--frames-dir', help='directory of recorded JPEG/WebP frames to replay')
+    parser.add_argument('--synthetic-frames', type=int, default=32, help='distinct synthetic frames to cycle through')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--url', help='base ws:// URL of a running server, e.g. ws://host:8000/ws/sign-language')
+    parser.add_argument('--port', type=int, default=8765, help='port for the in-process server')
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help='simulated latency of the stubbed LLM call')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, force=True)
+    asyncio.run(main(args))
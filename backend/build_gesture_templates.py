@@ -0,0 +1,82 @@
+"""Build the dynamic gesture template library from recorded frame streams.
+
+Record each movement with FRAME_RECORD_DIR set, then label the recordings:
+
+    python build_gesture_templates.py LOOP=recordings/loop1.slfr LOOP=recordings/loop2.slfr \\
+        IF=recordings/if1.slfr --band 4
+
+Every recording becomes one template: MediaPipe tracks the hand through its
+frames and the landmark sequence is saved to GESTURE_TEMPLATES
+(data/gestures/gesture_templates.npz).
+"""
+import argparse
+from pathlib import Path
+from typing import List, Optional
+import cv2
+import mediapipe as mp
+import numpy as np
+from services.dynamic_gestures import DEFAULT_TEMPLATES_PATH, TemplateLibrary
+from services.frame_decoder import decode_frame
+from services.frame_recorder import read_recording
+from services.landmark_features import landmarks_to_array
+
+
+def landmark_sequence(path: Path) -> np.ndarray:
+    """T x 21 x 3 landmarks of the first hand in every frame where one is found"""
+    frames = []
+    with mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1,
+                                  min_detection_confidence=0.5) as hands:
+        for frame in read_recording(path):
+            image = decode_frame(frame['payload'])
+            if image is None:
+                continue
+            results = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            if results.multi_hand_landmarks:
+                frames.append(landmarks_to_array(results.multi_hand_landmarks)[0])
+    return np.array(frames, np.float32)
+
+
+def auto_max_distance(library: TemplateLibrary, margin: float) -> Optional[float]:
+    """Half-way (by default) to the nearest template of a different gesture, over the median template"""
+    nearest: List[float] = []
+    for i, label in enumerate(library.labels):
+        others = library.labels != label
+        if not others.any():
+            continue
+        rival = TemplateLibrary(library.templates[others], library.labels[others], band=library.band)
+        # Templates are already resampled features, so compare them directly
+        _, distance = rival.match_features(library.templates[i])
+        nearest.append(distance)
+    return float(np.median(nearest) * margin) if nearest else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the dynamic gesture template library')
+    parser.add_argument('recordings', nargs='+', metavar='LABEL=PATH',
+                        help='.slfr recordings labelled with the gesture they show')
+    parser.add_argument('--band', type=int, default=4, help='DTW warping window in template steps')
+    parser.add_argument('--max-distance', type=float,
+                        help='reject windows farther than this per step (default: derived from the templates)')
+    parser.add_argument('--margin', type=float, default=0.5,
+                        help='fraction of the median distance between different gestures used by default')
+    parser.add_argument('--min-frames', type=int, default=8, help='skip recordings with fewer hand frames')
+    parser.add_argument('--output', default=DEFAULT_TEMPLATES_PATH)
+    args = parser.parse_args()
+
+    sequences, labels = [], []
+    for item in args.recordings:
+        label, sep, path = item.partition('=')
+        if not sep:
+            parser.error(f"expected LABEL=PATH, got '{item}'")
+        sequence = landmark_sequence(Path(path))
+        print(f"{label}: {path} has {len(sequence)} hand frames")
+        if len(sequence) >= args.min_frames:
+            sequences.append(sequence)
+            labels.append(label.upper())
+    if not sequences:
+        parser.error('no recording had enough hand frames')
+
+    library = TemplateLibrary.from_sequences(sequences, labels, band=args.band)
+    library.max_distance = args.max_distance or auto_max_distance(library, args.margin)
+    library.save(Path(args.output))
+    print(f"Saved {library.stats()} to {args.output}")
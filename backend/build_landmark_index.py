@@ -0,0 +1,68 @@
+"""Build the landmark exemplar index used by the MediaPipe recognizer.
+
+Expects one directory of example photos per gesture, named after the gesture
+(LOOP, IF, FUNCTION, VARIABLE, ...):
+
+    python build_landmark_index.py exemplars/ --mode knn --k 5
+
+Hands are located with MediaPipe in static image mode, turned into landmark
+feature vectors and saved to LANDMARK_INDEX (data/gestures/landmark_index.npz).
+"""
+import argparse
+from pathlib import Path
+from typing import List, Optional, Tuple
+import cv2
+import mediapipe as mp
+import numpy as np
+from services.landmark_features import DEFAULT_INDEX_PATH, ExemplarIndex, landmark_features, landmarks_to_array
+
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def collect_exemplars(image_dir: Path) -> Tuple[np.ndarray, List[str]]:
+    features, labels = [], []
+    with mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1,
+                                  min_detection_confidence=0.5) as hands:
+        for gesture_dir in sorted(p for p in image_dir.iterdir() if p.is_dir()):
+            found = 0
+            for image_file in sorted(gesture_dir.iterdir()):
+                if image_file.suffix.lower() not in IMAGE_SUFFIXES:
+                    continue
+                image = cv2.imread(str(image_file))
+                if image is None:
+                    continue
+                results = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+                if results.multi_hand_landmarks:
+                    features.append(landmark_features(landmarks_to_array(results.multi_hand_landmarks))[0])
+                    labels.append(gesture_dir.name.upper())
+                    found += 1
+            print(f"{gesture_dir.name}: {found} exemplars")
+    return np.array(features, np.float32), labels
+
+
+def auto_max_distance(index: ExemplarIndex, features: np.ndarray, margin: float) -> Optional[float]:
+    """Reject matches farther than the 95th percentile training distance times ``margin``"""
+    _, distances = index.classify(features)
+    return float(np.percentile(distances, 95) * margin) if len(distances) else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the landmark exemplar index')
+    parser.add_argument('image_dir', help='directory with one sub-directory of images per gesture')
+    parser.add_argument('--mode', choices=ExemplarIndex.MODES, default='centroid')
+    parser.add_argument('--k', type=int, default=5, help='neighbours that vote in knn mode')
+    parser.add_argument('--max-distance', type=float,
+                        help='reject hands farther than this from every match (default: derived from the exemplars)')
+    parser.add_argument('--margin', type=float, default=1.5,
+                        help='multiplier on the 95th percentile exemplar distance for the default --max-distance')
+    parser.add_argument('--output', default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+
+    features, labels = collect_exemplars(Path(args.image_dir))
+    if not labels:
+        parser.error(f"no hands found in {args.image_dir}")
+
+    index = ExemplarIndex(features, labels, mode=args.mode, k=args.k)
+    index.max_distance = args.max_distance or auto_max_distance(index, features, args.margin)
+    index.save(Path(args.output))
+    print(f"Saved {index.stats()} to {args.output}")
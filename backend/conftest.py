@@ -0,0 +1 @@
+# Lets tests import the backend's ``services`` package when pytest is run from this directory
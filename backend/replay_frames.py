@@ -0,0 +1,116 @@
+"""Replay recorded frame streams through a recognizer for offline profiling.
+
+Recordings are written by the WebSocket handler when FRAME_RECORD_DIR is set.
+Each frame is decoded and classified by a registered recognizer backend, either
+at the pace it originally arrived or as fast as possible:
+
+    python replay_frames.py recordings/*.slfr --recognizer brightness --speed max --output before.json
+
+The JSON summary includes a digest of the recognized gestures, so two runs
+(e.g. before and after a recognizer change) can be compared directly.
+"""
+import argparse
+import hashlib
+import json
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+from services.frame_decoder import decode_frame
+from services.frame_recorder import read_recording
+from services.recognizer_registry import available_recognizers, get_recognizer
+
+
+def replay(path: Path, recognizer, speed: str, reduced_decode: bool = True, batch_size: int = 1) -> Dict:
+    decode_times: List[float] = []
+    process_times: List[float] = []
+    gestures: List[str] = []
+    pending: List[np.ndarray] = []
+
+    def flush():
+        # Batches go through the backend's batch API in one call
+        t0 = time.perf_counter()
+        if len(pending) > 1:
+            results = recognizer.detect_gestures(pending)
+        else:
+            results = [recognizer.detect_gesture(pending[0])]
+        per_frame = (time.perf_counter() - t0) / len(pending)
+        process_times.extend([per_frame] * len(pending))
+        gestures.extend(gesture or 'NO_GESTURE' for gesture in results)
+        pending.clear()
+
+    start = time.perf_counter()
+    for frame in read_recording(path):
+        if speed == 'original':
+            # Sleep until the frame's original arrival offset
+            delay = frame['offset'] - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        t0 = time.perf_counter()
+        image = decode_frame(frame['payload'], recognizer.input_spec if reduced_decode else None)
+        decode_times.append(time.perf_counter() - t0)
+        if image is None:
+            gestures.append('NO_GESTURE')
+            process_times.append(0.0)
+            continue
+
+        pending.append(image)
+        if len(pending) >= batch_size:
+            flush()
+    if pending:
+        flush()
+
+    return {
+        'recording': str(path),
+        'recognizer': recognizer.cost(),
+        'frames': len(gestures),
+        'batch_size': batch_size,
+        'elapsed_s': round(time.perf_counter() - start, 3),
+        'decode_ms': _summarize(decode_times),
+        'process_frame_ms': _summarize(process_times),
+        'gestures': dict(Counter(gestures)),
+        'gesture_digest': hashlib.sha256('\n'.join(gestures).encode()).hexdigest()[:16]
+    }
+
+
+def _summarize(samples: List[float]) -> Dict:
+    if not samples:
+        return {}
+    values = np.array(samples) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'mean': round(float(values.mean()), 3),
+        'p50': round(float(p50), 3),
+        'p95': round(float(p95), 3),
+        'p99': round(float(p99), 3),
+        'max': round(float(values.max()), 3)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay recorded frame streams through a recognizer')
+    parser.add_argument('recordings', nargs='+', help='.slfr files written by the frame recorder')
+    parser.add_argument('--recognizer', choices=available_recognizers(), default='brightness')
+    parser.add_argument('--speed', choices=['original', 'max'], default='max',
+                        help='replay at the recorded pace or as fast as possible')
+    parser.add_argument('--full-decode', action='store_true',
+                        help="decode full color frames instead of the recognizer's reduced input")
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='frames per detect_gestures() batch call')
+    parser.add_argument('--output', help='write the JSON summary to this file')
+    args = parser.parse_args()
+    if args.batch_size > 1 and args.speed == 'original':
+        parser.error('--batch-size needs --speed max')
+
+    recognizer = get_recognizer(args.recognizer)
+    results = []
+    for recording in args.recordings:
+        results.append(replay(Path(recording), recognizer, args.speed,
+                              reduced_decode=not args.full_decode, batch_size=args.batch_size))
+
+    summary = json.dumps(results, indent=2)
+    print(summary)
+    if args.output:
+        Path(args.output).write_text(summary)
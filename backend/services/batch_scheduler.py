@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from services.frame_executor import FrameExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class BatchScheduler:
+    """Collects work items from many sessions and runs them as one batched call.
+
+    Items are gathered until ``max_batch_size`` is reached or ``max_wait_ms``
+    has passed since the first item arrived. The batch function receives the
+    list of items, runs on the executor, and must return one result per item;
+    results are scattered back to the awaiting callers. Items submitted with a
+    ``key`` are split by executor shard, so in process mode each session's
+    items still reach the worker that holds its state.
+    """
+
+    def __init__(self,
+                 batch_fn: Callable[[List[Any]], List[Any]],
+                 executor: FrameExecutor,
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._running = set()
+
+        # Batch statistics
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any, key: Optional[str] = None) -> Any:
+        """Queue an item for the next batch and wait for its result"""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._pending.put((item, key, future))
+        return await future
+
+    def _ensure_started(self):
+        if self._collector is None or self._collector.done():
+            self._pending = asyncio.Queue()
+            self._collector = asyncio.create_task(self._collect())
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Run the batch without blocking collection of the next one
+            task = asyncio.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, Optional[str], asyncio.Future]]):
+        # Callers that went away (e.g. disconnected sessions) don't need results
+        batch = [entry for entry in batch if not entry[2].cancelled()]
+        if not batch:
+            return
+
+        shards: Dict[int, List[Tuple[Any, Optional[str], asyncio.Future]]] = {}
+        for entry in batch:
+            shards.setdefault(self.executor.shard(entry[1]), []).append(entry)
+        await asyncio.gather(*(self._run_shard(entries) for entries in shards.values()))
+
+    async def _run_shard(self, batch: List[Tuple[Any, Optional[str], asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.executor.run(self.batch_fn, [item for item, _, _ in batch], key=batch[0][1])
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} items failed: {str(e)}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        if self._collector is not None:
+            self._collector.cancel()
+            self._collector = None
+
+    def stats(self) -> Dict:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0
+        }
@@ -2,12 +2,16 @@ from typing import Dict, List
 import openai
 import os
 from datetime import datetime
+from services.single_flight import SingleFlight, prompt_key
 
 class ChatService:
     def __init__(self):
         self.openai = openai
         self.openai.api_key = os.getenv('OPENAI_API_KEY')
         self.conversation_history = {}
+        # Requests whose full message list is identical (e.g. the same opening
+        # question from many users) share one in-flight completion
+        self.in_flight = SingleFlight('chat_service')
         
     async def get_response(self, user_id: str, message: str) -> Dict:
         try:
@@ -30,14 +34,7 @@ class ChatService:
             ]
             
             # Get AI response
-            response = await self.openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.7,
-                max_tokens=150
-            )
-            
-            ai_message = response.choices[0].message['content']
+            ai_message = await self.in_flight.do(prompt_key(messages), lambda: self._complete(messages))
             
             # Add AI response to history
             self.conversation_history[user_id].append({
@@ -55,4 +52,13 @@ class ChatService:
             return {
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
-            } 
\ No newline at end of file
+            }
+
+    async def _complete(self, messages: List[Dict]) -> str:
+        response = await self.openai.ChatCompletion.acreate(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=150
+        )
+        return response.choices[0].message['content'] 
\ No newline at end of file
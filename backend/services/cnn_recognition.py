@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from services.recognizer_base import RecognizerBackend
+
+# Layout written by train_gesture_model.GestureModelTrainer
+DEFAULT_MODEL_DIR = os.getenv('GESTURE_MODEL_DIR', 'data/gestures')
+MODEL_INPUT_SIZE = (64, 64)
+# Written by GestureModelTrainer.export_tflite()
+TFLITE_MODEL = os.getenv('GESTURE_TFLITE_MODEL', 'gesture_model.tflite')
+# Batches are zero-padded up to the next of these sizes, each served by its own preallocated
+# interpreter, so varying micro-batch sizes never resize tensors at inference time
+TFLITE_BATCH_SIZES = tuple(sorted(int(size) for size in os.getenv('TFLITE_BATCH_SIZES', '1,4,8').split(',')))
+
+
+def load_gesture_classes(model_dir: Path) -> List[str]:
+    """Class names ordered by the index the model was trained with"""
+    with open(Path(model_dir) / 'gesture_mappings.json', 'r') as f:
+        mapping = json.load(f)
+    return [name for name, _ in sorted(mapping.items(), key=lambda item: item[1])]
+
+
+def preprocess_frames(frames: List[np.ndarray]) -> np.ndarray:
+    """Resize grayscale frames to the model input and stack them as N x 64 x 64 x 1 floats"""
+    batch = np.empty((len(frames), MODEL_INPUT_SIZE[1], MODEL_INPUT_SIZE[0], 1), np.float32)
+    for i, frame in enumerate(frames):
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        batch[i, :, :, 0] = cv2.resize(frame, MODEL_INPUT_SIZE, interpolation=cv2.INTER_AREA)
+    batch /= 255.0
+    return batch
+
+
+class CNNGestureRecognizer(RecognizerBackend):
+    """Serves the Keras CNN trained by GestureModelTrainer"""
+
+    name = 'cnn'
+    input_spec = {'color': 'gray', 'size': MODEL_INPUT_SIZE}
+    batched = True
+
+    def __init__(self, model_dir: str = DEFAULT_MODEL_DIR, min_confidence: float = 0.6):
+        # TensorFlow is only imported when this backend is actually selected
+        import tensorflow as tf
+
+        self.model_dir = Path(model_dir)
+        self.model = tf.keras.models.load_model(self.model_dir / 'gesture_model.h5')
+        self.gesture_classes = load_gesture_classes(self.model_dir)
+        self.min_confidence = min_confidence
+
+    def detect_gesture(self, frame: Optional[np.ndarray]) -> Optional[str]:
+        return self.detect_gestures([frame])[0]
+
+    def detect_gestures(self, frames: List[Optional[np.ndarray]]) -> List[Optional[str]]:
+        indices = [i for i, frame in enumerate(frames) if frame is not None]
+        gestures: List[Optional[str]] = [None] * len(frames)
+        if not indices:
+            return gestures
+
+        probabilities = self.predict(preprocess_frames([frames[i] for i in indices]))
+        return self._scatter(gestures, indices, probabilities)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict_on_batch(batch)
+
+    def _scatter(self, gestures: List[Optional[str]], indices: List[int], probabilities: np.ndarray):
+        best = np.argmax(probabilities, axis=1)
+        confident = probabilities[np.arange(len(best)), best] >= self.min_confidence
+        for i, class_index, ok in zip(indices, best, confident):
+            if ok:
+                gestures[i] = self.gesture_classes[class_index]
+        return gestures
+
+
+def load_tflite_interpreter(model_path: Path, num_threads: Optional[int] = None):
+    """Create a TFLite interpreter, preferring the standalone tflite-runtime package"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        # Full TensorFlow ships the same interpreter
+        from tensorflow.lite import Interpreter
+    return Interpreter(model_path=str(model_path), num_threads=num_threads)
+
+
+class TFLiteGestureRecognizer(CNNGestureRecognizer):
+    """Serves the CNN exported by GestureModelTrainer.export_tflite().
+
+    The interpreter is far lighter to load and run than Keras. Int8-quantized
+    models are fed and read through their quantization parameters. There is
+    one interpreter per size in ``batch_sizes``, allocated for that batch
+    size once; a batch is padded up to the nearest size (larger batches are
+    split) so it is one invoke() with no tensor reallocation.
+    """
+
+    name = 'cnn_tflite'
+
+    def __init__(self, model_dir: str = DEFAULT_MODEL_DIR, model_file: str = TFLITE_MODEL,
+                 min_confidence: float = 0.6, num_threads: Optional[int] = None,
+                 batch_sizes: Sequence[int] = TFLITE_BATCH_SIZES):
+        self.model_dir = Path(model_dir)
+        self.model_path = self.model_dir / model_file
+        self.num_threads = num_threads
+        self.gesture_classes = load_gesture_classes(self.model_dir)
+        self.min_confidence = min_confidence
+        self.batch_sizes = tuple(sorted(set(batch_sizes)))
+
+        # Interpreters are not thread-safe; each has its own lock so different sizes run concurrently
+        self._interpreters: Dict[int, Tuple[object, threading.Lock]] = {}
+        self._interpreters_lock = threading.Lock()
+        self.interpreter = self._interpreter(1)[0]
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+
+    @property
+    def quantized(self) -> bool:
+        return self._input['dtype'] == np.int8
+
+    def _interpreter(self, batch_size: int) -> Tuple[object, threading.Lock]:
+        """The interpreter allocated for ``batch_size``, created on first use"""
+        entry = self._interpreters.get(batch_size)
+        if entry is None:
+            with self._interpreters_lock:
+                entry = self._interpreters.get(batch_size)
+                if entry is None:
+                    interpreter = load_tflite_interpreter(self.model_path, self.num_threads)
+                    index = interpreter.get_input_details()[0]['index']
+                    interpreter.resize_tensor_input(
+                        index, [batch_size, MODEL_INPUT_SIZE[1], MODEL_INPUT_SIZE[0], 1])
+                    interpreter.allocate_tensors()
+                    entry = self._interpreters[batch_size] = (interpreter, threading.Lock())
+        return entry
+
+    def _padded_size(self, count: int) -> int:
+        for size in self.batch_sizes:
+            if size >= count:
+                return size
+        return self.batch_sizes[-1]
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        if self.quantized:
+            scale, zero_point = self._input['quantization']
+            batch = np.clip(np.round(batch / scale + zero_point), -128, 127).astype(np.int8)
+
+        outputs = []
+        start = 0
+        while start < len(batch):
+            size = self._padded_size(len(batch) - start)
+            chunk = batch[start:start + size]
+            count = len(chunk)
+            if count < size:
+                chunk = np.concatenate([chunk, np.zeros((size - count,) + chunk.shape[1:], chunk.dtype)])
+            interpreter, lock = self._interpreter(size)
+            with lock:
+                interpreter.set_tensor(self._input['index'], chunk)
+                interpreter.invoke()
+                outputs.append(interpreter.get_tensor(self._output['index'])[:count])
+            start += count
+        probabilities = np.concatenate(outputs)
+
+        if self._output['dtype'] == np.int8:
+            scale, zero_point = self._output['quantization']
+            probabilities = (probabilities.astype(np.float32) - zero_point) * scale
+        return probabilities
+
+    def warm_up(self) -> float:
+        """Allocate every batch size's interpreter up front, then time a single frame"""
+        for size in self.batch_sizes:
+            self._interpreter(size)
+        return super().warm_up()
+
+    def cost(self) -> Dict:
+        return {**super().cost(), 'batch_sizes': list(self.batch_sizes)}
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+from services.metrics import CODE_CACHE_EVICTIONS, CODE_CACHE_HITS, CODE_CACHE_MISSES
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(gesture_sequence: Sequence[str], language: str, prompt_version: int) -> str:
+    """Normalized key: gesture names upper-cased, language lower-cased, prompt version first"""
+    gestures = ','.join(str(gesture).strip().upper() for gesture in gesture_sequence)
+    return f"v{prompt_version}|{language.strip().lower()}|{gestures}"
+
+
+class CodeCache:
+    """LRU cache of generated code with a TTL, optionally backed by SQLite.
+
+    The in-memory dict serves repeated sequences without touching disk.
+    With ``path`` set, every entry is also written to a SQLite file so the
+    cache survives restarts; memory misses fall through to it, and entries
+    found there are promoted back into memory. Expiry uses wall-clock time
+    so it stays meaningful across restarts.
+
+    On the event loop use ``aget`` and ``aset``: memory is served inline and
+    only the SQLite tier runs on a worker thread.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 86400.0, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries: 'OrderedDict[str, Tuple[float, Dict]]' = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if path:
+            self._open(path)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _open(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS code_cache '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        removed = self._db.execute('DELETE FROM code_cache WHERE expires_at <= ?', (time.time(),)).rowcount
+        logger.info(f"Opened code cache at {path} (pruned {removed} expired entries)")
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        return self._promote(key, self._fetch(key, now))
+
+    async def aget(self, key: str) -> Optional[Dict]:
+        """Like ``get``, with the SQLite lookup moved off the event loop"""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+        row = await asyncio.to_thread(self._fetch, key, now) if self._db is not None else None
+        return self._promote(key, row)
+
+    def set(self, key: str, value: Dict):
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, value)
+        self._store(key, value, expires_at)
+
+    async def aset(self, key: str, value: Dict):
+        """Like ``set``, with the SQLite write moved off the event loop"""
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._store, key, value, expires_at)
+
+    def _get_memory(self, key: str, now: float) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        CODE_CACHE_HITS.labels('memory').inc()
+        return entry[1]
+
+    def _promote(self, key: str, row: Optional[Tuple[Dict, float]]) -> Optional[Dict]:
+        """Count a disk hit or a miss; disk hits are moved back into memory"""
+        if row is None:
+            self.misses += 1
+            CODE_CACHE_MISSES.inc()
+            return None
+        value, expires_at = row
+        self._remember(key, expires_at, value)
+        self.disk_hits += 1
+        CODE_CACHE_HITS.labels('disk').inc()
+        return value
+
+    def _remember(self, key: str, expires_at: float, value: Dict):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            CODE_CACHE_EVICTIONS.inc()
+
+    def _fetch(self, key: str, now: float) -> Optional[Tuple[Dict, float]]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                'SELECT value, expires_at FROM code_cache WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _store(self, key: str, value: Dict, expires_at: float):
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO code_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), expires_at)
+            )
+
+    def clear(self):
+        self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute('DELETE FROM code_cache')
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'persistent': self._db is not None,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+        }
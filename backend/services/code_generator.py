@@ -1,32 +1,66 @@
+import logging
+import time
 import openai
-from typing import Dict, Optional
+from typing import Awaitable, Callable, Dict, Optional
+from services.code_cache import CodeCache, cache_key
+from services.code_synthesizer import synthesize
+from services.metrics import CODE_SYNTHESIZED, LLM_CALLS, LLM_ERRORS, LLM_TIME_TO_FIRST_TOKEN
+from services.single_flight import SingleFlight, prompt_key
+
+# Bump whenever the prompts or model settings change so cached code is not reused
+PROMPT_VERSION = 1
+MODEL = "gpt-3.5-turbo"
+TEMPERATURE = 0.7
+MAX_TOKENS = 150
+
+logger = logging.getLogger(__name__)
 
 class CodeGenerator:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[CodeCache] = None, local_synthesis: bool = True):
         openai.api_key = api_key
         self.context = []
         self.max_context_length = 5
+        self.cache = cache
+        self.local_synthesis = local_synthesis
+        # Identical prompts in flight at the same time share one LLM call
+        self.in_flight = SingleFlight('code_generator')
 
     async def generate_code(self, 
                           gesture_sequence: list, 
-                          language: str = 'javascript') -> Dict:
-        """Generate code from gesture sequence using OpenAI"""
+                          language: str = 'javascript',
+                          on_delta: Optional[Callable[[str], Awaitable]] = None) -> Dict:
+        """Generate code from gesture sequence, using OpenAI only for sequences the templates can't compose.
+
+        With ``on_delta`` set, the LLM response is streamed and every code
+        fragment is passed to it as it arrives; the returned result still
+        holds the complete code. Local and cached code is returned whole
+        without calling ``on_delta``, as is a result shared from an identical
+        request already in flight.
+        """
+        if self.local_synthesis:
+            code = synthesize(gesture_sequence, language)
+            if code is not None:
+                CODE_SYNTHESIZED.inc()
+                return {
+                    'status': 'success',
+                    'code': code,
+                    'language': language
+                }
+
+        key = cache_key(gesture_sequence, language, PROMPT_VERSION)
+        if self.cache is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return {**cached, 'language': language}
+
         try:
             # Create prompt from gesture sequence
-            prompt = self._create_prompt(gesture_sequence, language)
-            
-            # Generate code using OpenAI
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt(language)},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=150
-            )
-            
-            code = response.choices[0].message.content.strip()
+            messages = [
+                {"role": "system", "content": self._get_system_prompt(language)},
+                {"role": "user", "content": self._create_prompt(gesture_sequence, language)}
+            ]
+            request_key = prompt_key(MODEL, TEMPERATURE, MAX_TOKENS, messages)
+            code = await self.in_flight.do(request_key, lambda: self._complete(messages, key, on_delta))
             return {
                 'status': 'success',
                 'code': code,
@@ -40,6 +74,54 @@ class CodeGenerator:
                 'code': None
             }
 
+    async def _complete(self, messages: list, key: str,
+                        on_delta: Optional[Callable[[str], Awaitable]] = None) -> str:
+        """One LLM round trip, shared by every caller waiting on the same prompt"""
+        try:
+            # Generate code using OpenAI
+            LLM_CALLS.inc()
+            start = time.perf_counter()
+            response = await openai.ChatCompletion.acreate(
+                model=MODEL,
+                messages=messages,
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS,
+                stream=on_delta is not None
+            )
+            if on_delta is None:
+                code = response.choices[0].message.content
+            else:
+                code = await self._read_stream(response, on_delta, start)
+        except Exception:
+            LLM_ERRORS.inc()
+            raise
+
+        code = code.strip()
+        # Only successful generations are cached; errors are retried next time
+        if self.cache is not None:
+            await self.cache.aset(key, {'status': 'success', 'code': code})
+        return code
+
+    async def _read_stream(self, response, on_delta: Callable[[str], Awaitable], start: float) -> str:
+        """Collect a streamed completion, forwarding each fragment to ``on_delta``"""
+        parts = []
+        async for chunk in response:
+            delta = chunk.choices[0].delta.get('content')
+            if not delta:
+                continue
+            if not parts:
+                LLM_TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - start)
+            parts.append(delta)
+
+            if on_delta is not None:
+                try:
+                    await on_delta(delta)
+                except Exception as e:
+                    # The stream may be shared with other callers; keep reading for them
+                    logger.debug(f"Stopped forwarding code deltas: {str(e)}")
+                    on_delta = None
+        return ''.join(parts)
+
     def _create_prompt(self, gesture_sequence: list, language: str) -> str:
         """Create prompt from gesture sequence"""
         gesture_text = " ".join(gesture_sequence)
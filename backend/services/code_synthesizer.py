@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from services.code_templates import BODY, SUPPORTED_LANGUAGES, TEMPLATES, fill_body, fill_name, identifier
+
+
+def synthesize(gesture_sequence: Sequence[str], language: str) -> Optional[str]:
+    """Compose a gesture sequence into code from the template tables, or None if it can't.
+
+    Block gestures (templates with a {body} marker, e.g. LOOP) wrap everything
+    that follows them; statement gestures (e.g. VARIABLE) are emitted in
+    order. LOOP IF VARIABLE therefore becomes a loop containing an if that
+    declares a variable. Repeated gestures get fresh identifiers (i, j, ...;
+    myVariable2) so nested loops and repeated declarations still compile.
+    Unknown gestures or languages, and nestings the language doesn't allow
+    (a Java method inside a block), return None so the caller can fall
+    back to the LLM.
+    """
+    return _synthesize(tuple(str(gesture).strip().upper() for gesture in gesture_sequence),
+                       language.strip().lower())
+
+
+@lru_cache(maxsize=1024)
+def _synthesize(gestures: Tuple[str, ...], language: str) -> Optional[str]:
+    if not gestures or language not in SUPPORTED_LANGUAGES:
+        return None
+
+    entries: List[Dict] = []
+    names: List[str] = []
+    uses: Dict[str, int] = {}
+    nested = False
+    for gesture in gestures:
+        entry = TEMPLATES.get((gesture, language))
+        if entry is None:
+            return None
+        # A gesture is inside a block once any block gesture precedes it
+        if nested and entry['top_level_only']:
+            return None
+        count = uses.get(gesture, 0)
+        uses[gesture] = count + 1
+        names.append(identifier(entry['identifiers'], count) if entry['identifiers'] else '')
+        entries.append(entry)
+        nested = nested or BODY in entry['template']
+
+    # Build inside-out so each block receives the code that follows it as its body
+    body: Optional[str] = None
+    for entry, name in zip(reversed(entries), reversed(names)):
+        template = fill_name(entry['template'], name)
+        if BODY in template:
+            body = fill_body(template, entry['placeholder'] if body is None else body)
+        else:
+            body = template if body is None else f"{template}\n{body}"
+    return body
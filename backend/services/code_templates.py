@@ -0,0 +1,97 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Every gesture's code in every supported language, in one file; adding a language is
+# a matter of adding its comment syntax and one template per gesture
+DEFINITIONS_PATH = os.getenv('GESTURE_DEFINITIONS', str(Path(__file__).with_name('gesture_definitions.json')))
+
+BODY = '{body}'
+NAME = '{name}'
+
+
+def fill_body(template: str, body: str) -> str:
+    """Put ``body`` at the template's {body} marker, indenting each of its lines like the marker"""
+    lines = []
+    for line in template.split('\n'):
+        position = line.find(BODY)
+        if position < 0:
+            lines.append(line)
+            continue
+        indent = line[:position]
+        lines.extend(indent + body_line if body_line else body_line for body_line in body.split('\n'))
+    return '\n'.join(lines)
+
+
+def fill_name(template: str, name: str) -> str:
+    """Put the identifier ``name`` (a loop counter, variable or function name) at every {name} marker"""
+    return template.replace(NAME, name)
+
+
+def identifier(identifiers: List[str], uses: int) -> str:
+    """Name for a gesture's ``uses``-th earlier occurrence: i, j, k, then i4, i5...; myVariable, myVariable2..."""
+    if uses < len(identifiers):
+        return identifiers[uses]
+    return f"{identifiers[0]}{uses + 1}"
+
+
+def compile_templates(definitions: Dict) -> Dict[Tuple[str, str], Dict]:
+    """Expand the definitions into one ready-to-send entry per (gesture, language)"""
+    languages = definitions['languages']
+    tables = {}
+    for gesture, spec in definitions['gestures'].items():
+        missing = set(languages) - set(spec['templates'])
+        if missing:
+            raise ValueError(f"Gesture {gesture} has no template for {sorted(missing)}")
+
+        for language, template in spec['templates'].items():
+            if language not in languages:
+                raise ValueError(f"Gesture {gesture} has a template for unknown language {language}")
+            identifiers = spec.get('identifiers', [])
+            if isinstance(identifiers, dict):
+                identifiers = identifiers.get(language, [])
+            if NAME in template and not identifiers:
+                raise ValueError(f"Gesture {gesture} uses {NAME} but has no identifiers for {language}")
+
+            # A block whose body is only a comment; languages that need a statement there set empty_block
+            placeholder_format = languages[language].get('empty_block', languages[language]['comment'])
+            placeholder = placeholder_format.format(text=definitions['placeholder'])
+            command = fill_body(template, placeholder)
+            tables[(gesture, language)] = {
+                'name': spec['name'],
+                'description': spec['description'],
+                'command': fill_name(command, identifiers[0]) if identifiers else command,
+                'template': template,
+                'placeholder': placeholder,
+                'identifiers': identifiers,
+                # Constructs the language only allows outside any block (e.g. Java methods)
+                'top_level_only': language in spec.get('top_level_only', [])
+            }
+    return tables
+
+
+def load_definitions(path: str = DEFINITIONS_PATH) -> Dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+# Built once at import; lookups are a single dict access
+_DEFINITIONS = load_definitions()
+TEMPLATES = compile_templates(_DEFINITIONS)
+SUPPORTED_LANGUAGES: List[str] = list(_DEFINITIONS['languages'])
+DEFAULT_LANGUAGE: str = _DEFINITIONS['default_language']
+GESTURES: List[str] = list(_DEFINITIONS['gestures'])
+
+
+def get_template(gesture: Optional[str], language: str = DEFAULT_LANGUAGE) -> Optional[Dict]:
+    """Template entry for a gesture, in the default language when ``language`` is unsupported"""
+    entry = TEMPLATES.get((gesture, language))
+    if entry is None and language not in SUPPORTED_LANGUAGES:
+        entry = TEMPLATES.get((gesture, DEFAULT_LANGUAGE))
+    return entry
+
+
+def template_table(language: str = DEFAULT_LANGUAGE) -> Dict[str, Dict]:
+    """All gestures' entries for one language, keyed by gesture"""
+    return {gesture: TEMPLATES[(gesture, language)] for gesture in GESTURES}
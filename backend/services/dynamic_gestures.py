@@ -0,0 +1,241 @@
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from services.landmark_features import MIDDLE_FINGER_MCP, NUM_LANDMARKS, WRIST
+
+# Written by build_gesture_templates.py
+DEFAULT_TEMPLATES_PATH = os.getenv('GESTURE_TEMPLATES', 'data/gestures/gesture_templates.npz')
+TEMPLATE_LENGTH = 32
+
+
+def motion_features(points: np.ndarray) -> np.ndarray:
+    """Describe a T x 21 x 3 landmark sequence as T x 44 per-frame features.
+
+    Each frame contributes its hand shape (wrist-relative x/y divided by the
+    palm size) and the wrist's position relative to the first frame, in
+    units of the mean palm size, so both pose and movement count.
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)[..., :2]
+    relative = points - points[:, WRIST:WRIST + 1]
+    scale = np.maximum(np.linalg.norm(relative[:, MIDDLE_FINGER_MCP], axis=1), 1e-6)
+    shape = relative / scale[:, None, None]
+    trajectory = (points[:, WRIST] - points[0, WRIST]) / scale.mean()
+    return np.concatenate([shape.reshape(len(points), -1), trajectory], axis=1)
+
+
+def resample(sequence: np.ndarray, length: int = TEMPLATE_LENGTH) -> np.ndarray:
+    """Linearly resample a T x D sequence to ``length`` steps"""
+    positions = np.linspace(0, len(sequence) - 1, length)
+    low = np.floor(positions).astype(int)
+    high = np.minimum(low + 1, len(sequence) - 1)
+    weight = (positions - low)[:, None]
+    return sequence[low] * (1 - weight) + sequence[high] * weight
+
+
+def envelopes(templates: np.ndarray, band: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Upper and lower LB_Keogh envelopes of M x L x D templates within a +/- ``band`` warping window"""
+    windows = 2 * band + 1
+    padded_max = np.pad(templates, ((0, 0), (band, band), (0, 0)), constant_values=-np.inf)
+    padded_min = np.pad(templates, ((0, 0), (band, band), (0, 0)), constant_values=np.inf)
+    upper = np.lib.stride_tricks.sliding_window_view(padded_max, windows, axis=1).max(axis=-1)
+    lower = np.lib.stride_tricks.sliding_window_view(padded_min, windows, axis=1).min(axis=-1)
+    return upper, lower
+
+
+def lb_keogh(query: np.ndarray, upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """Squared LB_Keogh lower bound of the banded DTW between an L x D query and every template"""
+    excess = np.maximum(query - upper, 0) + np.maximum(lower - query, 0)
+    return np.einsum('mld,mld->m', excess, excess)
+
+
+def banded_dtw(query: np.ndarray, templates: np.ndarray, band: int, best_so_far: float) -> np.ndarray:
+    """Squared DTW between an L x D query and C x L x D templates, abandoning any above ``best_so_far``.
+
+    All candidates share one C x L x L cost tensor and advance one DTW row
+    at a time; within a row the left-to-right dependency is resolved with a
+    cumulative minimum, so the Python loop only runs over the L rows.
+    Abandoned candidates come back as inf.
+    """
+    count, length, _ = templates.shape
+    # |q - t|^2 for every frame pair of every candidate at once
+    cost = (np.einsum('id,id->i', query, query)[None, :, None]
+            + np.einsum('cjd,cjd->cj', templates, templates)[:, None, :]
+            - 2 * query @ templates.transpose(0, 2, 1))
+    np.maximum(cost, 0, out=cost)
+
+    columns = np.arange(length)
+    previous = np.full((count, length), np.inf)
+    active = np.ones(count, bool)
+    for i in range(length):
+        outside = np.abs(columns - i) > band
+        row_cost = np.where(outside, 0.0, cost[:, i])
+        # Best way into each cell from the row above (diagonal or straight down)
+        if i == 0:
+            above = np.full((count, length), np.inf)
+            above[:, 0] = 0.0
+        else:
+            above = np.minimum(previous, np.concatenate([np.full((count, 1), np.inf), previous[:, :-1]], axis=1))
+        entry = np.where(outside, np.inf, row_cost + above)
+        # current[j] = min(entry[j], current[j-1] + cost[j]) as a prefix minimum
+        prefix = np.cumsum(row_cost, axis=1)
+        current = np.minimum.accumulate(entry - prefix, axis=1) + prefix
+        current[:, outside] = np.inf
+
+        # Early abandoning: no warping path can get cheaper than its row minimum
+        active &= current.min(axis=1) <= best_so_far
+        if not active.any():
+            return np.full(count, np.inf)
+        previous = current
+
+    distances = previous[:, -1]
+    distances[~active] = np.inf
+    return distances
+
+
+class TemplateLibrary:
+    """Dynamic gesture templates matched against landmark windows with banded DTW.
+
+    Templates are resampled to TEMPLATE_LENGTH steps so every LB_Keogh bound
+    comes from one vectorized computation. Candidates are then verified in
+    ascending bound order, in chunks, each chunk sharing one cost tensor;
+    chunks whose bound cannot beat the best match so far are pruned, and
+    matching stops early once ``budget_ms`` is spent.
+    """
+
+    def __init__(self, templates: np.ndarray, labels: Sequence[str], band: int = 4,
+                 max_distance: Optional[float] = None, chunk_size: int = 16):
+        templates = np.asarray(templates, dtype=np.float32)
+        if templates.ndim != 3 or len(templates) != len(labels) or not len(labels):
+            raise ValueError('templates must be M x L x D with one label per template')
+
+        self.templates = templates
+        self.labels = np.asarray(labels)
+        self.band = band
+        self.max_distance = max_distance
+        self.chunk_size = chunk_size
+        self.upper, self.lower = envelopes(templates, band)
+
+        self.matches = 0
+        self.lb_pruned = 0
+        self.abandoned = 0
+        self.verified = 0
+        self.over_budget = 0
+
+    @classmethod
+    def from_sequences(cls, sequences: Sequence[np.ndarray], labels: Sequence[str], **kwargs) -> 'TemplateLibrary':
+        """Build from raw T x 21 x 3 landmark sequences of any length"""
+        return cls(np.stack([resample(motion_features(s)) for s in sequences]), labels, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def match(self, window: np.ndarray, budget_ms: Optional[float] = None) -> Tuple[Optional[str], float]:
+        """Best template for a T x 21 x 3 landmark window as (label or None, per-step distance)"""
+        start = time.perf_counter()
+        query = resample(motion_features(window), self.templates.shape[1])
+        return self.match_features(query, budget_ms, start)
+
+    def match_features(self, query: np.ndarray, budget_ms: Optional[float] = None,
+                       start: Optional[float] = None) -> Tuple[Optional[str], float]:
+        """Like match() for a query already resampled to L x D motion features"""
+        start = start or time.perf_counter()
+        self.matches += 1
+        length = self.templates.shape[1]
+        # Same dtype as the templates, or every bound pays for a float64 upcast
+        query = query.astype(np.float32, copy=False)
+
+        # Distances are compared squared and summed over the path; max_distance is per step
+        best = np.inf if self.max_distance is None else self.max_distance ** 2 * length
+        best_index = None
+        bounds = lb_keogh(query, self.upper, self.lower)
+        order = np.argsort(bounds)
+        candidates = order[bounds[order] < best]
+        self.lb_pruned += len(order) - len(candidates)
+        for offset in range(0, len(candidates), self.chunk_size):
+            chunk = candidates[offset:offset + self.chunk_size]
+            # The best match may have improved since the initial pruning
+            keep = bounds[chunk] < best
+            self.lb_pruned += int((~keep).sum())
+            if not keep.any():
+                # Sorted by bound, so nothing further can win either
+                self.lb_pruned += len(candidates) - offset - len(chunk)
+                break
+            if budget_ms is not None and offset and (time.perf_counter() - start) * 1000 > budget_ms:
+                self.over_budget += 1
+                break
+            chunk = chunk[keep]
+
+            distances = banded_dtw(query, self.templates[chunk], self.band, best)
+            self.verified += len(chunk)
+            self.abandoned += int(np.isinf(distances).sum())
+            winner = int(np.argmin(distances))
+            if distances[winner] < best:
+                best, best_index = float(distances[winner]), int(chunk[winner])
+
+        if best_index is None:
+            return None, float('inf')
+        return str(self.labels[best_index]), float(np.sqrt(best / length))
+
+    def save(self, path: Path):
+        np.savez_compressed(
+            path, templates=self.templates, labels=self.labels, band=self.band,
+            max_distance=np.nan if self.max_distance is None else self.max_distance
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> 'TemplateLibrary':
+        data = np.load(path, allow_pickle=False)
+        max_distance = float(data['max_distance'])
+        return cls(data['templates'], data['labels'], band=int(data['band']),
+                   max_distance=None if np.isnan(max_distance) else max_distance)
+
+    def stats(self) -> Dict:
+        return {
+            'templates': len(self),
+            'band': self.band,
+            'max_distance': self.max_distance,
+            'matches': self.matches,
+            'lb_pruned': self.lb_pruned,
+            'dtw_verified': self.verified,
+            'dtw_abandoned': self.abandoned,
+            'over_budget': self.over_budget
+        }
+
+
+class LandmarkWindow:
+    """Sliding window of one session's most recent hand landmarks.
+
+    Frames without a hand are tolerated up to ``max_gap`` in a row; a longer
+    gap means the movement ended and the window starts over.
+    """
+
+    def __init__(self, size: int = 16, max_gap: int = 2):
+        self.size = size
+        self.max_gap = max_gap
+        self._frames = deque(maxlen=size)
+        self._gap = 0
+
+    def push(self, points: Optional[np.ndarray]) -> bool:
+        """Add one frame's 21 x 3 landmarks (None for no hand); True once the window is full"""
+        if points is None:
+            self._gap += 1
+            if self._gap > self.max_gap:
+                self._frames.clear()
+            return False
+
+        self._gap = 0
+        self._frames.append(points)
+        return len(self._frames) == self.size
+
+    def array(self) -> np.ndarray:
+        return np.stack(self._frames)
+
+    def reset(self):
+        self._frames.clear()
+        self._gap = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
@@ -0,0 +1,87 @@
+import struct
+from typing import Dict, Optional, Tuple
+import cv2
+import numpy as np
+
+# Input a recognizer wants: 'gray' or 'bgr', and the smallest (width, height) it can work with.
+# A size of None means full resolution.
+FULL_COLOR_SPEC = {'color': 'bgr', 'size': None}
+
+# imdecode flags by downscale factor; for JPEG, libjpeg scales in the DCT domain
+# so reduced decodes skip most of the IDCT and color conversion work.
+_DECODE_FLAGS = {
+    'gray': {
+        1: cv2.IMREAD_GRAYSCALE,
+        2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+        4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+        8: cv2.IMREAD_REDUCED_GRAYSCALE_8
+    },
+    'bgr': {
+        1: cv2.IMREAD_COLOR,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8
+    }
+}
+
+# Start-of-frame markers that carry the image dimensions
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field
+_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+
+def jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from a JPEG header without decoding; None if not a JPEG"""
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    i = 2
+    length = len(data)
+    while i + 3 < length:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            i += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker in _SOF_MARKERS:
+            if i + 9 > length:
+                return None
+            height, width = struct.unpack_from('!HH', data, i + 5)
+            return width, height
+        if marker == 0xDA:
+            # Start of scan reached without a frame header
+            return None
+        i += 2 + struct.unpack_from('!H', data, i + 2)[0]
+    return None
+
+
+def reduction_factor(dimensions: Optional[Tuple[int, int]], target: Optional[Tuple[int, int]]) -> int:
+    """Largest power-of-two downscale that still covers the target size"""
+    if dimensions is None or target is None:
+        return 1
+
+    width, height = dimensions
+    target_width, target_height = target
+    for factor in (8, 4, 2):
+        if width // factor >= target_width and height // factor >= target_height:
+            return factor
+    return 1
+
+
+def decode_frame(payload: bytes, spec: Optional[Dict] = None) -> Optional[np.ndarray]:
+    """Decode an encoded frame directly into the color mode and size a recognizer needs"""
+    if not payload:
+        return None
+    spec = spec or FULL_COLOR_SPEC
+    color = spec.get('color', 'bgr')
+    factor = reduction_factor(jpeg_dimensions(payload), spec.get('size'))
+    try:
+        return cv2.imdecode(np.frombuffer(payload, np.uint8), _DECODE_FLAGS[color][factor])
+    except cv2.error:
+        # Truncated or corrupt payloads are treated like undecodable frames
+        return None
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import time
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from services.frame_decoder import decode_frame
+from services.recognizer_registry import DEFAULT_RECOGNIZER, get_recognizer
+from services.motion_gate import check_motion
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ('thread', 'process')
+
+# Decode straight to the recognizer's declared color mode and size; set to 0 to always decode full color
+REDUCED_DECODE = os.getenv('FRAME_REDUCED_DECODE', '1') != '0'
+
+
+def _decode(payload: bytes, recognizer) -> Optional[np.ndarray]:
+    return decode_frame(payload, recognizer.input_spec if REDUCED_DECODE else None)
+
+
+def decode_and_detect(job: Dict) -> Dict:
+    """Decode an encoded image, gate it on motion and classify it. Runs inside the executor.
+
+    ``job`` carries the encoded ``payload``, the ``recognizer`` backend name,
+    the ``session`` id, and the session's motion ``reference`` thumbnail and
+    ``motion_threshold``. Backends are loaded once per worker process by the
+    recognizer registry and are shared by threads; stateful backends key
+    their state on the session id, which only holds together if a session's
+    frames always reach the same process (see ``FrameExecutor.run``'s
+    ``key``). The result holds the
+    gesture (None when skipped), the new thumbnail and the time spent per
+    stage, so timings can be recorded on the event loop even when the work
+    ran in another process.
+    """
+    recognizer = get_recognizer(job.get('recognizer', DEFAULT_RECOGNIZER))
+    start = time.perf_counter()
+    frame = _decode(job['payload'], recognizer)
+    decoded = time.perf_counter()
+    moved, thumbnail = check_motion(frame, job.get('reference'), job.get('motion_threshold', 0.0))
+    gated = time.perf_counter()
+    gesture = recognizer.detect_session_gesture(job.get('session'), frame) if moved else None
+    return {
+        'gesture': gesture,
+        'moved': moved,
+        'thumbnail': thumbnail,
+        'timings': {
+            'imdecode': decoded - start,
+            'motion_gate': gated - decoded,
+            'process_frame': time.perf_counter() - gated
+        }
+    }
+
+
+def decode_and_gate(job: Dict) -> Dict:
+    """Decode and motion-gate one frame without classifying it. Runs inside the executor.
+
+    Used when the recognizer call is micro-batched: every frame still
+    decodes on its own worker, and a frame that moved is returned decoded
+    so ``detect_batch`` can classify it together with other sessions'.
+    """
+    recognizer = get_recognizer(job.get('recognizer', DEFAULT_RECOGNIZER))
+    start = time.perf_counter()
+    frame = _decode(job['payload'], recognizer)
+    decoded = time.perf_counter()
+    moved, thumbnail = check_motion(frame, job.get('reference'), job.get('motion_threshold', 0.0))
+    return {
+        'frame': frame if moved else None,
+        'gesture': None,
+        'moved': moved,
+        'thumbnail': thumbnail,
+        'timings': {
+            'imdecode': decoded - start,
+            'motion_gate': time.perf_counter() - decoded,
+            'process_frame': 0.0
+        }
+    }
+
+
+def detect_batch(jobs: List[Dict]) -> List[Dict]:
+    """Classify decoded frames from many sessions with one call per backend. Runs inside the executor.
+
+    Each job carries the decoded ``frame``, its ``recognizer`` and ``session``;
+    each result holds the gesture and the per-frame share of the call.
+    """
+    results: List[Optional[Dict]] = [None] * len(jobs)
+    groups: Dict[str, List[int]] = {}
+    for index, job in enumerate(jobs):
+        groups.setdefault(job.get('recognizer', DEFAULT_RECOGNIZER), []).append(index)
+
+    for name, indices in groups.items():
+        start = time.perf_counter()
+        gestures = get_recognizer(name).detect_session_gestures(
+            [jobs[index].get('session') for index in indices], [jobs[index]['frame'] for index in indices])
+        # Recognition cost is amortized over the frames in the batch
+        per_frame = (time.perf_counter() - start) / len(indices)
+        for index, gesture in zip(indices, gestures):
+            results[index] = {'gesture': gesture, 'process_frame': per_frame}
+    return results
+
+
+class FrameExecutor:
+    """Runs CPU-bound frame work on a thread or process pool so the event loop only does I/O.
+
+    In process mode the pool is split into single-worker shards and work is
+    routed by a key (the session id), so per-session recognizer state (pooled
+    graphs, ROI windows, gesture windows) lives in one process instead of
+    being fragmented across workers.
+    """
+
+    def __init__(self, mode: str = 'thread', max_workers: Optional[int] = None):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}', expected one of {EXECUTOR_MODES}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        if mode == 'process':
+            self._shards: List[Executor] = [
+                ProcessPoolExecutor(max_workers=1) for _ in range(max_workers or os.cpu_count() or 1)
+            ]
+        else:
+            self._shards = [ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='frame-worker')]
+        self._next_shard = 0
+        logger.info(f"FrameExecutor started in {mode} mode (max_workers={max_workers or 'default'})")
+
+    def shard(self, key: Optional[str] = None) -> int:
+        """Index of the pool that runs work for ``key``; keyless work is spread round-robin"""
+        if len(self._shards) == 1:
+            return 0
+        if key is None:
+            self._next_shard = (self._next_shard + 1) % len(self._shards)
+            return self._next_shard
+        # Stable across runs (unlike hash()) so a session always maps to the same worker
+        return zlib.crc32(key.encode('utf-8')) % len(self._shards)
+
+    async def run(self, func: Callable, *args, key: Optional[str] = None):
+        """Run ``func(*args)`` on the pool and await its result.
+
+        Work for the same ``key`` always runs in the same worker process.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._shards[self.shard(key)], func, *args)
+
+    def shutdown(self, wait: bool = True):
+        for executor in self._shards:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,84 @@
+import base64
+import binascii
+import struct
+from typing import Dict, Optional
+
+# Binary frame layout (network byte order):
+#   version (uint8) | language id (uint8) | sequence (uint32) | timestamp ms (float64)
+# followed by the raw JPEG/WebP bytes.
+FRAME_HEADER = struct.Struct('!BBId')
+FRAME_PROTOCOL_VERSION = 1
+
+PROTOCOL_JSON = 'json'
+PROTOCOL_BINARY = 'binary'
+SUPPORTED_PROTOCOLS = [PROTOCOL_JSON, PROTOCOL_BINARY]
+
+LANGUAGE_IDS = {
+    'javascript': 0,
+    'python': 1,
+    'java': 2
+}
+LANGUAGES_BY_ID = {language_id: language for language, language_id in LANGUAGE_IDS.items()}
+
+
+class FrameProtocolError(ValueError):
+    """Raised when an incoming frame message cannot be parsed"""
+
+
+def parse_binary_frame(message: bytes) -> Dict:
+    """Split a binary WebSocket message into its header fields and image payload"""
+    if len(message) <= FRAME_HEADER.size:
+        raise FrameProtocolError('Binary frame is too short')
+
+    version, language_id, sequence, timestamp = FRAME_HEADER.unpack_from(message)
+    if version != FRAME_PROTOCOL_VERSION:
+        raise FrameProtocolError(f'Unsupported frame protocol version {version}')
+    if language_id not in LANGUAGES_BY_ID:
+        raise FrameProtocolError(f'Unknown language id {language_id}')
+
+    return {
+        'payload': message[FRAME_HEADER.size:],
+        'sequence': sequence,
+        'language': LANGUAGES_BY_ID[language_id],
+        'timestamp': timestamp
+    }
+
+
+def parse_json_frame(data: Dict) -> Dict:
+    """Decode a legacy JSON frame carrying a base64 data URL"""
+    frame_url = data['frame']
+    if not isinstance(frame_url, str):
+        raise FrameProtocolError('Frame must be a base64 data URL string')
+    _, _, encoded = frame_url.partition(',')
+    try:
+        # Strict decoding: characters outside the base64 alphabet are an error, not silently dropped
+        payload = base64.b64decode(encoded or frame_url, validate=True)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise FrameProtocolError(f'Invalid base64 frame: {e}')
+    if not payload:
+        raise FrameProtocolError('Empty frame payload')
+    sequence = data.get('sequence')
+    # bool is an int subclass but never a valid sequence number
+    if sequence is not None and (isinstance(sequence, bool) or not isinstance(sequence, int)):
+        raise FrameProtocolError(f'Frame sequence must be an integer, got {type(sequence).__name__}')
+
+    return {
+        'payload': payload,
+        'sequence': sequence,
+        'language': data.get('language', 'javascript'),
+        'timestamp': data.get('timestamp')
+    }
+
+
+def encode_binary_frame(payload: bytes,
+                        sequence: int,
+                        language: str = 'javascript',
+                        timestamp: Optional[float] = 0.0) -> bytes:
+    """Build a binary frame message (used by tooling that talks to the socket)"""
+    header = FRAME_HEADER.pack(
+        FRAME_PROTOCOL_VERSION,
+        LANGUAGE_IDS.get(language, 0),
+        sequence & 0xFFFFFFFF,
+        timestamp or 0.0
+    )
+    return header + bytes(payload)
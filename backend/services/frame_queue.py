@@ -0,0 +1,69 @@
+import asyncio
+import sys
+from collections import deque
+from typing import Dict
+
+
+class LatestFrameQueue:
+    """Small bounded frame queue where the newest frame always wins.
+
+    When the queue is full the oldest (stalest) frame is discarded before it
+    is ever decoded, so recognition never falls behind the user's hands.
+    """
+
+    def __init__(self, maxsize: int = 1):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+
+        self.maxsize = maxsize
+        self._frames = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+
+        # Per-session counters
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+
+    def put(self, frame: Dict) -> int:
+        """Enqueue a frame, dropping the oldest one if the queue is full.
+
+        Returns the number of frames dropped to make room.
+        """
+        self.received += 1
+        dropped = 1 if len(self._frames) == self.maxsize else 0
+        self.dropped += dropped
+        self._frames.append(frame)
+        self._ready.set()
+        return dropped
+
+    async def get(self) -> Dict:
+        """Wait for and return the oldest frame still queued"""
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popleft()
+
+    def task_done(self):
+        self.processed += 1
+
+    def clear(self) -> int:
+        """Discard pending frames, e.g. when recognition is stopped"""
+        dropped = len(self._frames)
+        self.dropped += dropped
+        self._frames.clear()
+        return dropped
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by queued frames"""
+        return sys.getsizeof(self._frames) + sum(len(frame['payload']) for frame in self._frames)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def stats(self) -> Dict:
+        return {
+            'queued': len(self._frames),
+            'received': self.received,
+            'dropped': self.dropped,
+            'processed': self.processed
+        }
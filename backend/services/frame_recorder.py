@@ -0,0 +1,137 @@
+import asyncio
+import re
+import struct
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+from services.frame_protocol import LANGUAGE_IDS, LANGUAGES_BY_ID
+
+# Recording container: a file header followed by append-only frame records.
+#   header: magic (4 bytes) | version (uint8)
+#   record: offset seconds (float64) | sequence (uint32) | language id (uint8) | length (uint32) | payload
+RECORDING_MAGIC = b'SLFR'
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct('!4sB')
+RECORD_HEADER = struct.Struct('!dIBI')
+RECORDING_SUFFIX = '.slfr'
+
+# Sequence number stored when the client didn't send one
+NO_SEQUENCE = 0xFFFFFFFF
+
+# Frames waiting for the background writer; past this the recording drops frames rather than memory growing
+MAX_PENDING_WRITES = 256
+
+
+class FrameRecorder:
+    """Appends a session's incoming encoded frames and arrival times to a recording file.
+
+    On the event loop use ``submit`` and ``aclose``: frames are queued and
+    written by a background task on a worker thread, so disk I/O never
+    blocks the socket. ``record`` and ``close`` write synchronously.
+    """
+
+    def __init__(self, path: Path, buffer_size: int = 1 << 16, max_pending: int = MAX_PENDING_WRITES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[BinaryIO] = open(self.path, 'ab', buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION))
+        self._start = time.monotonic()
+        self.frames = 0
+        self.bytes = 0
+        self.dropped = 0
+        self._max_pending = max_pending
+        self._pending: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_session(cls, record_dir: str, session_id: str) -> 'FrameRecorder':
+        safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', session_id)
+        name = f"{safe_id}-{time.strftime('%Y%m%d-%H%M%S')}{RECORDING_SUFFIX}"
+        return cls(Path(record_dir) / name)
+
+    def submit(self, frame: Dict) -> bool:
+        """Queue a frame for the background writer; returns False if it was dropped"""
+        if self._file is None:
+            return False
+        if self._writer is None:
+            self._pending = asyncio.Queue(maxsize=self._max_pending)
+            self._writer = asyncio.create_task(self._write_pending())
+        try:
+            self._pending.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    async def _write_pending(self):
+        while True:
+            batch: List[Optional[Dict]] = [await self._pending.get()]
+            while not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            frames = [frame for frame in batch if frame is not None]
+            if frames:
+                await asyncio.to_thread(self._record_all, frames)
+            if len(frames) < len(batch):
+                return
+
+    def _record_all(self, frames: List[Dict]):
+        for frame in frames:
+            self.record(frame)
+
+    def record(self, frame: Dict):
+        if self._file is None:
+            return
+
+        payload = frame['payload']
+        sequence = frame.get('sequence')
+        # Arrival time is taken from the frame so queued writes keep the original timing
+        self._file.write(RECORD_HEADER.pack(
+            frame.get('received_at', time.monotonic()) - self._start,
+            NO_SEQUENCE if sequence is None else sequence & 0xFFFFFFFF,
+            LANGUAGE_IDS.get(frame.get('language'), 0),
+            len(payload)
+        ))
+        self._file.write(payload)
+        self.frames += 1
+        self.bytes += RECORD_HEADER.size + len(payload)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def aclose(self):
+        """Flush frames still queued for the writer, then close the file off the event loop"""
+        if self._writer is not None:
+            await self._pending.put(None)
+            await self._writer
+            self._writer = None
+        await asyncio.to_thread(self.close)
+
+
+def read_recording(path: Path) -> Iterator[Dict]:
+    """Yield frames from a recording in the order they arrived"""
+    with open(path, 'rb') as f:
+        header = f.read(RECORDING_HEADER.size)
+        if len(header) < RECORDING_HEADER.size:
+            raise ValueError(f'{path} is not a frame recording')
+        magic, version = RECORDING_HEADER.unpack(header)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f'{path} is not a version {RECORDING_VERSION} frame recording')
+
+        while True:
+            record = f.read(RECORD_HEADER.size)
+            if len(record) < RECORD_HEADER.size:
+                # End of file, or a record cut short by a crash mid-write
+                return
+            offset, sequence, language_id, length = RECORD_HEADER.unpack(record)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield {
+                'payload': payload,
+                'offset': offset,
+                'sequence': None if sequence == NO_SEQUENCE else sequence,
+                'language': LANGUAGES_BY_ID.get(language_id, 'javascript')
+            }
@@ -1,83 +1,146 @@
 import cv2
+import logging
 import numpy as np
-from typing import Dict, Optional
-
-class GestureRecognizer:
-    def __init__(self):
-        # Define gesture mappings
-        self.gesture_mappings = {
-            'LOOP': {
-                'name': 'For Loop',
-                'command': 'for (let i = 0; i < 10; i++) {\n    // Your code here\n}',
-                'description': 'Creates a for loop'
-            },
-            'IF': {
-                'name': 'If Statement',
-                'command': 'if (condition) {\n    // Your code here\n}',
-                'description': 'Creates an if statement'
-            },
-            'FUNCTION': {
-                'name': 'Function',
-                'command': 'function myFunction() {\n    // Your code here\n}',
-                'description': 'Creates a function'
-            },
-            'VARIABLE': {
-                'name': 'Variable',
-                'command': 'let myVariable = "";',
-                'description': 'Declares a variable'
-            }
-        }
+from collections import deque
+from typing import Dict, List, Optional
+from services.code_templates import DEFAULT_LANGUAGE, get_template, template_table
+from services.recognizer_base import RecognizerBackend
+
+logger = logging.getLogger(__name__)
+
+# Gesture name, description and default-language code, from the shared template tables
+GESTURE_MAPPINGS = template_table(DEFAULT_LANGUAGE)
+
+# Simple mapping based on average brightness: a frame brighter than
+# BRIGHTNESS_THRESHOLDS[i - 1] (and not brighter than [i]) maps to BRIGHTNESS_GESTURES[i]
+BRIGHTNESS_THRESHOLDS = np.array([100, 150, 200])
+BRIGHTNESS_GESTURES = np.array(['VARIABLE', 'FUNCTION', 'IF', 'LOOP'])
+
+# Frames blurred per GaussianBlur call; OpenCV caps the channel count of a single image
+_MAX_BLUR_CHANNELS = 128
+
+
+def classify_brightness(values: np.ndarray) -> np.ndarray:
+    """Map average brightness values to gesture names in one vectorized call"""
+    return BRIGHTNESS_GESTURES[np.digitize(values, BRIGHTNESS_THRESHOLDS, right=True)]
+
+
+class GestureRecognizer(RecognizerBackend):
+    name = 'brightness'
+    # Brightness only needs a small grayscale image, so frames can be decoded reduced
+    input_spec = {'color': 'gray', 'size': (160, 120)}
+    # detect_gestures() is vectorized, but a frame costs microseconds either way, so
+    # frames are classified as soon as they are decoded rather than waiting for a batch
+    batched = False
+
+    def __init__(self, max_sequence_length: int = 5):
+        # Gesture mappings are read-only and shared by every instance
+        self.gesture_mappings = GESTURE_MAPPINGS
         
-        # Initialize gesture sequence
-        self.gesture_sequence = []
-        self.max_sequence_length = 5
-        print("GestureRecognizer initialized successfully")
+        # Initialize gesture sequence as a fixed-size ring buffer
+        self.gesture_sequence = deque(maxlen=max_sequence_length)
+        self.max_sequence_length = max_sequence_length
+        # Created once per session, so keep this out of the default log output
+        logger.debug("GestureRecognizer initialized successfully")
 
     def process_frame(self, frame: np.ndarray) -> Dict:
         """Process a video frame and return detected gesture and code."""
-        if frame is None:
+        gesture = self.detect_gesture(frame)
+        if gesture is None:
             return self._create_empty_response()
 
-        # Basic image processing
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return self.record_gesture(gesture)
+
+    def detect_gesture(self, frame: Optional[np.ndarray]) -> Optional[str]:
+        """Classify a single frame without touching the gesture sequence.
+
+        This is safe to call from worker threads or processes.
+        """
+        if frame is None:
+            return None
+
+        # Basic image processing; frames may already arrive as grayscale
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         blur = cv2.GaussianBlur(gray, (7, 7), 0)
         
         # Simple gesture detection based on average pixel values
         # This is a placeholder - replace with your actual gesture detection logic
         avg_value = np.mean(blur)
         
-        # Simple mapping based on average brightness
-        if avg_value > 200:
-            gesture = "LOOP"
-        elif avg_value > 150:
-            gesture = "IF"
-        elif avg_value > 100:
-            gesture = "FUNCTION"
-        else:
-            gesture = "VARIABLE"
-            
+        return str(classify_brightness(avg_value))
+
+    def detect_gestures(self, frames: List[Optional[np.ndarray]]) -> List[Optional[str]]:
+        """Classify a batch of frames, vectorizing over frames that share a shape."""
+        gestures: List[Optional[str]] = [None] * len(frames)
+        
+        # Frames from different clients can differ in size; stack each shape separately
+        groups: Dict[tuple, List[int]] = {}
+        for index, frame in enumerate(frames):
+            if frame is not None:
+                groups.setdefault(frame.shape, []).append(index)
+        
+        for indices in groups.values():
+            stack = np.stack([frames[index] for index in indices])
+            for index, gesture in zip(indices, self._detect_stack(stack)):
+                gestures[index] = str(gesture)
+        return gestures
+
+    def process_frames(self, batch: np.ndarray) -> List[Dict]:
+        """Process an N x H x W (or N x H x W x 3 BGR) stack of frames.
+
+        Gestures are classified in one vectorized pass, then recorded into the
+        sequence in order.
+        """
+        responses = []
+        for gesture in self._detect_stack(batch):
+            responses.append(self.record_gesture(str(gesture)))
+        return responses
+
+    def _detect_stack(self, stack: np.ndarray) -> np.ndarray:
+        """Blur, average and classify a whole stack of same-sized frames"""
+        if len(stack) == 0:
+            return np.array([], dtype=BRIGHTNESS_GESTURES.dtype)
+
+        count, height, width = stack.shape[:3]
+        if stack.ndim == 4:
+            # Stacked frames form one tall image, so a single cvtColor converts them all
+            stack = cv2.cvtColor(stack.reshape(count * height, width, 3), cv2.COLOR_BGR2GRAY)
+            stack = stack.reshape(count, height, width)
+
+        # With frames as channels (H x W x N), one GaussianBlur call filters the whole stack
+        channels = np.ascontiguousarray(np.moveaxis(stack, 0, -1))
+        averages = np.empty(count)
+        for start in range(0, count, _MAX_BLUR_CHANNELS):
+            chunk = channels[:, :, start:start + _MAX_BLUR_CHANNELS]
+            blur = cv2.GaussianBlur(np.ascontiguousarray(chunk), (7, 7), 0)
+            if blur.ndim == 2:
+                blur = blur[:, :, np.newaxis]
+            averages[start:start + chunk.shape[2]] = blur.mean(axis=(0, 1))
+
+        return classify_brightness(averages)
+
+    def record_gesture(self, gesture: str, language: str = DEFAULT_LANGUAGE) -> Dict:
+        """Append a detected gesture to the sequence and build the response."""
         # Update gesture sequence
         self._update_gesture_sequence(gesture)
         
-        # Get code template
-        command = self.gesture_mappings[gesture]['command']
+        # Get code template; other backends may report gestures without a template
+        template = get_template(gesture, language) or {}
         
-        return self._create_response(gesture, command)
+        return self._create_response(gesture, template.get('command', ''), template.get('description', gesture))
 
     def _update_gesture_sequence(self, gesture: str):
-        """Update the sequence of detected gestures"""
+        """Update the sequence of detected gestures; the oldest falls off the ring buffer"""
         self.gesture_sequence.append(gesture)
-        if len(self.gesture_sequence) > self.max_sequence_length:
-            self.gesture_sequence.pop(0)
 
-    def _create_response(self, gesture: str, command: str) -> Dict:
+    def _create_response(self, gesture: str, command: str, description: str) -> Dict:
         """Create standardized response dictionary"""
         return {
             'gesture_name': gesture,
             'confidence': 0.95,  # Placeholder confidence
             'command': command,
-            'gesture_sequence': self.gesture_sequence,
-            'description': self.gesture_mappings[gesture]['description'],
+            'gesture_sequence': list(self.gesture_sequence),
+            'description': description,
             'status': 'success'
         }
 
@@ -87,7 +150,7 @@ class GestureRecognizer:
             'gesture_name': 'NO_GESTURE',
             'confidence': 0.0,
             'command': '',
-            'gesture_sequence': self.gesture_sequence,
+            'gesture_sequence': list(self.gesture_sequence),
             'description': 'No gesture detected',
             'status': 'no_gesture'
         } 
\ No newline at end of file
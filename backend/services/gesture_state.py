@@ -0,0 +1,69 @@
+import sys
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class GestureStateMachine:
+    """Turns per-frame gesture guesses into committed gesture transitions.
+
+    Raw observations go into a fixed-size ring buffer. A gesture is committed
+    only once it fills the whole buffer (hysteresis), differs from the gesture
+    currently held, and at least ``debounce_ms`` has passed since the last
+    commit. Holding a gesture therefore commits it once; releasing it (no
+    gesture for the same number of frames) allows it to be committed again.
+    """
+
+    def __init__(self, hysteresis_frames: int = 3, debounce_ms: float = 500.0):
+        if hysteresis_frames < 1:
+            raise ValueError('hysteresis_frames must be at least 1')
+
+        self.hysteresis_frames = hysteresis_frames
+        self.debounce = debounce_ms / 1000.0
+        self._recent = deque(maxlen=hysteresis_frames)
+        self.current: Optional[str] = None
+        self._last_commit = float('-inf')
+
+        self.observations = 0
+        self.commits = 0
+
+    @property
+    def last_observed(self) -> Optional[str]:
+        return self._recent[-1] if self._recent else None
+
+    def observe(self, gesture: Optional[str], now: Optional[float] = None) -> Optional[str]:
+        """Feed one frame's gesture (None for no gesture); returns a newly committed gesture"""
+        self.observations += 1
+        self._recent.append(gesture)
+        if len(self._recent) < self.hysteresis_frames or self._recent.count(gesture) != len(self._recent):
+            return None
+
+        if gesture == self.current:
+            return None
+        if gesture is None:
+            # Stable release: the held gesture may be committed again later
+            self.current = None
+            return None
+
+        now = time.monotonic() if now is None else now
+        if now - self._last_commit < self.debounce:
+            return None
+
+        self.current = gesture
+        self._last_commit = now
+        self.commits += 1
+        return gesture
+
+    def reset(self):
+        self._recent.clear()
+        self.current = None
+
+    def memory_usage(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self._recent)
+
+    def stats(self) -> Dict:
+        return {
+            'gesture_observations': self.observations,
+            'gesture_commits': self.commits,
+            'current_gesture': self.current
+        }
@@ -0,0 +1,139 @@
+from typing import Dict, Optional, Tuple
+import cv2
+import numpy as np
+
+# (x0, y0, x1, y1) in pixels of the full frame
+Region = Tuple[int, int, int, int]
+
+
+class HandRoiTracker:
+    """Follows one session's hand so MediaPipe only sees the area around it.
+
+    After a frame with a hand, the next frame is cropped to the landmarks'
+    bounding box grown by ``padding`` (a fraction of the box size per side),
+    squared up and no smaller than ``min_size`` of the frame, then downscaled
+    so its longest side is at most ``max_side`` pixels. Once the hand is not
+    found in the crop, the caller falls back to the full frame.
+
+    The crop window stays fixed while the hand stays more than
+    ``recenter_margin`` (a fraction of the window side) inside it, so a
+    tracking-mode graph keeps seeing the same view from frame to frame; it
+    is only re-centred when the hand nears an edge. ``region()`` returns the
+    identical tuple while the window holds, so callers can reset graph
+    tracking whenever it changes.
+    """
+
+    def __init__(self, padding: float = 0.6, min_size: float = 0.15, max_side: int = 256,
+                 recenter_margin: float = 0.1):
+        self.padding = padding
+        self.min_size = min_size
+        self.max_side = max_side
+        self.recenter_margin = recenter_margin
+        # Normalized (cx, cy, half_width, half_height) of the last hand, or None
+        self._box: Optional[Tuple[float, float, float, float]] = None
+        # Current crop window and the frame shape it was computed for
+        self._region: Optional[Region] = None
+        self._shape: Optional[Tuple[int, int]] = None
+
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost = 0
+        self.recentred = 0
+        # Time spent searching crops and full frames, to compare their per-frame cost
+        self.roi_seconds = 0.0
+        self.full_seconds = 0.0
+
+    @property
+    def tracking(self) -> bool:
+        return self._box is not None
+
+    def region(self, shape: Tuple[int, ...]) -> Optional[Region]:
+        """Pixel region to search next, or None for the full frame"""
+        if self._box is None:
+            return None
+        if self._region is not None and self._shape == shape[:2]:
+            return self._region
+
+        height, width = shape[:2]
+        cx, cy, half_w, half_h = self._box
+        # Square in pixels so the hand keeps its aspect ratio after resizing
+        half = max(half_w * width, half_h * height, self.min_size * max(width, height) / 2)
+        x0, x1 = int(max(0, cx * width - half)), int(min(width, cx * width + half))
+        y0, y1 = int(max(0, cy * height - half)), int(min(height, cy * height + half))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        self._region, self._shape = (x0, y0, x1, y1), shape[:2]
+        self.recentred += 1
+        return self._region
+
+    def crop(self, frame: np.ndarray, region: Region) -> np.ndarray:
+        """Cut the region out of the frame at no more than ``max_side`` pixels"""
+        x0, y0, x1, y1 = region
+        crop = frame[y0:y1, x0:x1]
+        scale = self.max_side / max(crop.shape[:2])
+        if scale < 1:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return crop
+
+    def to_frame(self, points: np.ndarray, region: Region, shape: Tuple[int, ...]) -> np.ndarray:
+        """Map normalized crop landmarks (... x 21 x 3) back to full-frame coordinates, in place"""
+        height, width = shape[:2]
+        x0, y0, x1, y1 = region
+        points[..., 0] = (x0 + points[..., 0] * (x1 - x0)) / width
+        points[..., 1] = (y0 + points[..., 1] * (y1 - y0)) / height
+        return points
+
+    def update(self, landmarks: Optional[np.ndarray], from_roi: bool, seconds: float = 0.0):
+        """Record the outcome of a search; ``landmarks`` are one hand's full-frame 21 x 3 points or None"""
+        if from_roi:
+            self.roi_frames += 1
+            self.roi_seconds += seconds
+        else:
+            self.full_frames += 1
+            self.full_seconds += seconds
+            # The next crop is placed around wherever the full frame found the hand
+            self._region = None
+
+        if landmarks is None:
+            if self._box is not None:
+                self.lost += 1
+            self._box = None
+            self._region = None
+            return
+
+        low, high = landmarks[:, :2].min(axis=0), landmarks[:, :2].max(axis=0)
+        center = (low + high) / 2
+        half = (high - low) / 2 * (1 + 2 * self.padding)
+        self._box = (float(center[0]), float(center[1]), float(half[0]), float(half[1]))
+        if self._region is not None and not self._inside(low, high):
+            self._region = None
+
+    def _inside(self, low: np.ndarray, high: np.ndarray) -> bool:
+        """Whether the hand's normalized bounding box is clear of the window's edges.
+
+        Edges lying on the frame border don't count: re-centring can't move past them.
+        """
+        height, width = self._shape
+        x0, y0, x1, y1 = self._region
+        margin = self.recenter_margin * max(x1 - x0, y1 - y0)
+        return ((x0 == 0 or low[0] * width >= x0 + margin)
+                and (x1 == width or high[0] * width <= x1 - margin)
+                and (y0 == 0 or low[1] * height >= y0 + margin)
+                and (y1 == height or high[1] * height <= y1 - margin))
+
+    def reset(self):
+        self._box = None
+        self._region = None
+
+    def stats(self) -> Dict:
+        searched = self.roi_frames + self.full_frames
+        return {
+            'tracking': self.tracking,
+            'roi_frames': self.roi_frames,
+            'full_frames': self.full_frames,
+            'lost': self.lost,
+            'recentred': self.recentred,
+            'roi_ratio': round(self.roi_frames / searched, 3) if searched else 0.0,
+            'roi_ms': round(1000 * self.roi_seconds / self.roi_frames, 3) if self.roi_frames else None,
+            'full_ms': round(1000 * self.full_seconds / self.full_frames, 3) if self.full_frames else None
+        }
@@ -0,0 +1,298 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (Linux only)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PooledHands:
+    """One MediaPipe Hands graph plus the lock that serializes calls into it"""
+
+    def __init__(self, hands, init_seconds: float, memory_bytes: Optional[int]):
+        self.hands = hands
+        # Held for a whole frame by HandsPool.checkout, so it is reentrant
+        self.lock = threading.RLock()
+        self.init_seconds = init_seconds
+        self.memory_bytes = memory_bytes
+        self.session_id: Optional[str] = None
+        self.last_used = time.monotonic()
+        self.frames = 0
+
+    def process(self, rgb_frame: np.ndarray):
+        with self.lock:
+            self.last_used = time.monotonic()
+            self.frames += 1
+            return self.hands.process(rgb_frame)
+
+    def reset(self):
+        # Drop tracking state from the previous session before the graph is reused
+        reset = getattr(self.hands, 'reset', None)
+        if reset is not None:
+            with self.lock:
+                reset()
+
+    def close(self):
+        with self.lock:
+            self.hands.close()
+
+    def stats(self) -> Dict:
+        return {
+            'session': self.session_id,
+            'init_ms': round(self.init_seconds * 1000, 1),
+            'memory_bytes': self.memory_bytes,
+            'frames': self.frames,
+            'idle_seconds': round(time.monotonic() - self.last_used, 3)
+        }
+
+
+class HandsPool:
+    """Hands instances checked out per session so tracking state never mixes users.
+
+    A session keeps its instance until it is released or sits idle past
+    ``idle_timeout``; idle instances are then reset and reused, and closed
+    once more than ``min_idle`` of them are free. A bound instance is never
+    taken from its session: while all ``max_size`` instances are bound,
+    other sessions' frames run on one shared graph from ``static_factory``
+    (static image mode, so it keeps no state between frames) until an
+    instance frees up.
+
+    Per-session state from ``state_factory`` (e.g. the hand ROI and the
+    landmark window) is kept apart from the graphs, keyed by session, so it
+    survives whichever graph the session is running on. It is dropped on
+    release or after ``idle_timeout`` without frames.
+    """
+
+    def __init__(self, factory: Callable, max_size: int = 4, min_idle: int = 1,
+                 idle_timeout: float = 30.0, state_factory: Optional[Callable] = None,
+                 static_factory: Optional[Callable] = None):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+
+        self.factory = factory
+        self.state_factory = state_factory
+        self.static_factory = static_factory
+        self.max_size = max_size
+        self.min_idle = min(min_idle, max_size)
+        self.idle_timeout = idle_timeout
+        self._checked_out: Dict[Optional[str], PooledHands] = {}
+        self._idle: List[PooledHands] = []
+        self._lock = threading.Lock()
+        # Signalled whenever a reserved slot finishes (or fails) being created
+        self._created = threading.Condition(self._lock)
+        self._last_reclaim = time.monotonic()
+        self._creating = 0
+        self._static: Optional[PooledHands] = None
+        self._static_lock = threading.Lock()
+        self._states: Dict[Optional[str], object] = {}
+        self._state_used: Dict[Optional[str], float] = {}
+
+        self.created = 0
+        self.checkouts = 0
+        self.overflow_frames = 0
+        self.reclaimed = 0
+
+    def __len__(self) -> int:
+        return len(self._checked_out) + len(self._idle)
+
+    def _create(self, factory: Optional[Callable] = None) -> PooledHands:
+        # Process-wide RSS delta, so approximate when other threads allocate concurrently
+        rss = current_rss()
+        start = time.perf_counter()
+        hands = (factory or self.factory)()
+        init_seconds = time.perf_counter() - start
+        after = current_rss()
+        memory = after - rss if rss is not None and after is not None else None
+        self.created += 1
+        logger.info(f"Created MediaPipe Hands instance in {init_seconds * 1000:.0f}ms")
+        return PooledHands(hands, init_seconds, memory)
+
+    def warm_up(self, count: Optional[int] = None) -> List[float]:
+        """Create idle instances up front and run a blank frame through each"""
+        count = self.min_idle if count is None else min(count, self.max_size)
+        timings = []
+        with self._lock:
+            missing = max(0, min(count - len(self._idle), self.max_size - len(self) - self._creating))
+            self._creating += missing
+        created = []
+        try:
+            for _ in range(missing):
+                created.append(self._create())
+        finally:
+            with self._lock:
+                self._creating -= missing
+                self._idle.extend(created)
+                instances = list(self._idle)
+                self._created.notify_all()
+        blank = np.zeros((480, 640, 3), np.uint8)
+        for instance in instances:
+            start = time.perf_counter()
+            instance.process(blank)
+            instance.reset()
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    def session_state(self, session_id: Optional[str]):
+        """The session's own state, created on first use; None without a ``state_factory``"""
+        if self.state_factory is None:
+            return None
+        with self._lock:
+            state = self._states.get(session_id)
+            if state is None:
+                state = self._states[session_id] = self.state_factory()
+            self._state_used[session_id] = time.monotonic()
+            return state
+
+    @contextmanager
+    def checkout(self, session_id: Optional[str]) -> Iterator[PooledHands]:
+        """Hold the instance bound to ``session_id`` for one frame, binding one if needed.
+
+        The instance's lock is held until the block exits, so a release or
+        reclaim can't reset it while the frame is still being processed.
+        """
+        while True:
+            instance = self._bind(session_id)
+            with instance.lock:
+                # Released and rebound elsewhere while we waited for the lock: bind again
+                if instance is self._static or self._checked_out.get(session_id) is instance:
+                    instance.last_used = time.monotonic()
+                    yield instance
+                    return
+
+    def _bind(self, session_id: Optional[str]) -> PooledHands:
+        now = time.monotonic()
+        instance = None
+        overflow = False
+        with self._lock:
+            while True:
+                bound = self._checked_out.get(session_id)
+                if bound is not None:
+                    return bound
+
+                if now - self._last_reclaim >= self.idle_timeout / 4:
+                    self._reclaim(now)
+
+                if self._idle:
+                    instance = self._idle.pop()
+                    break
+                if len(self) + self._creating < self.max_size:
+                    # Reserve the slot; the graph is built without holding the pool lock
+                    self._creating += 1
+                    break
+                if not self._creating:
+                    # Every instance is bound to a live session
+                    self.overflow_frames += 1
+                    overflow = True
+                    break
+                # A slot is being built (e.g. by warm_up) and may come back idle
+                self._created.wait()
+
+        if overflow:
+            return self._static_hands()
+        if instance is None:
+            try:
+                instance = self._create()
+            finally:
+                with self._lock:
+                    self._creating -= 1
+                    self._created.notify_all()
+
+        with self._lock:
+            bound = self._checked_out.get(session_id)
+            if bound is not None:
+                # Another worker bound this session meanwhile
+                self._make_idle(instance)
+                return bound
+
+            instance.session_id = session_id
+            instance.last_used = now
+            self._checked_out[session_id] = instance
+            self.checkouts += 1
+            return instance
+
+    def _static_hands(self) -> PooledHands:
+        """The shared static-mode graph used while the pool is exhausted, created on first use"""
+        if self._static is None:
+            if self.static_factory is None:
+                raise RuntimeError(f'All {self.max_size} Hands instances are in use')
+            with self._static_lock:
+                if self._static is None:
+                    self._static = self._create(self.static_factory)
+        return self._static
+
+    def release(self, session_id: Optional[str]):
+        """Return a session's instance to the idle list"""
+        with self._lock:
+            self._states.pop(session_id, None)
+            self._state_used.pop(session_id, None)
+            instance = self._checked_out.pop(session_id, None)
+            if instance is not None:
+                self._make_idle(instance)
+
+    def reclaim_idle(self, now: Optional[float] = None):
+        with self._lock:
+            self._reclaim(now or time.monotonic())
+
+    def _make_idle(self, instance: PooledHands):
+        instance.reset()
+        instance.session_id = None
+        self._idle.append(instance)
+
+    def _reclaim(self, now: float):
+        self._last_reclaim = now
+        expired = [
+            session_id for session_id, instance in self._checked_out.items()
+            if now - instance.last_used >= self.idle_timeout
+        ]
+        for session_id in expired:
+            self._make_idle(self._checked_out.pop(session_id))
+            self.reclaimed += 1
+        for session_id in [key for key, used in self._state_used.items() if now - used >= self.idle_timeout]:
+            del self._states[session_id]
+            del self._state_used[session_id]
+
+        # Keep min_idle warm instances, close the rest once they have idled out
+        self._idle.sort(key=lambda instance: instance.last_used, reverse=True)
+        while len(self._idle) > self.min_idle and now - self._idle[-1].last_used >= self.idle_timeout:
+            self._idle.pop().close()
+
+    def close(self):
+        with self._lock:
+            for instance in list(self._checked_out.values()) + self._idle:
+                instance.close()
+            self._checked_out.clear()
+            self._idle.clear()
+            self._states.clear()
+            self._state_used.clear()
+        if self._static is not None:
+            self._static.close()
+            self._static = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            instances = list(self._checked_out.values()) + self._idle
+            return {
+                'size': len(instances),
+                'max_size': self.max_size,
+                'in_use': len(self._checked_out),
+                'idle': len(self._idle),
+                'created': self.created,
+                'checkouts': self.checkouts,
+                'overflow_frames': self.overflow_frames,
+                'static': self._static.stats() if self._static is not None else None,
+                'reclaimed': self.reclaimed,
+                'sessions': len(self._states),
+                'instances': [instance.stats() for instance in instances]
+            }
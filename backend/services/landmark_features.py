@@ -0,0 +1,140 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+NUM_LANDMARKS = 21
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_MCP = 9
+
+# Upper triangle of the 21 x 21 landmark distance matrix
+_PAIR_I, _PAIR_J = np.triu_indices(NUM_LANDMARKS, k=1)
+FEATURE_SIZE = NUM_LANDMARKS * 3 + len(_PAIR_I)
+
+# Written by build_landmark_index.py
+DEFAULT_INDEX_PATH = os.getenv('LANDMARK_INDEX', 'data/gestures/landmark_index.npz')
+
+
+def landmarks_to_array(hands: Sequence) -> np.ndarray:
+    """Stack MediaPipe hand landmark lists into an H x 21 x 3 float32 array"""
+    return np.array(
+        [[(point.x, point.y, point.z) for point in hand.landmark] for hand in hands],
+        dtype=np.float32
+    ).reshape(-1, NUM_LANDMARKS, 3)
+
+
+def landmark_features(points: np.ndarray) -> np.ndarray:
+    """Turn N x 21 x 3 landmarks into N x FEATURE_SIZE translation- and scale-invariant features.
+
+    Coordinates are taken relative to the wrist and divided by the palm size
+    (wrist to middle finger MCP), followed by every pairwise landmark
+    distance in the same units.
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+    relative = points - points[:, WRIST:WRIST + 1]
+    scale = np.linalg.norm(relative[:, MIDDLE_FINGER_MCP], axis=1)
+    relative /= np.maximum(scale, 1e-6)[:, None, None]
+
+    distances = np.linalg.norm(relative[:, _PAIR_I] - relative[:, _PAIR_J], axis=2)
+    return np.concatenate([relative.reshape(len(points), -1), distances], axis=1)
+
+
+class ExemplarIndex:
+    """Nearest-neighbour gesture classifier over landmark feature vectors.
+
+    In ``centroid`` mode each label is represented by the mean of its
+    exemplars; in ``knn`` mode the ``k`` nearest exemplars vote. Either way a
+    batch of hands is classified with one matrix distance computation, and
+    hands farther than ``max_distance`` from every match are rejected.
+    """
+
+    MODES = ('centroid', 'knn')
+
+    def __init__(self, features: np.ndarray, labels: Sequence[str], mode: str = 'centroid',
+                 k: int = 5, max_distance: Optional[float] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown index mode '{mode}', expected one of {self.MODES}")
+        if len(features) != len(labels) or not len(labels):
+            raise ValueError('features and labels must be non-empty and of equal length')
+
+        self.mode = mode
+        self.k = k
+        self.max_distance = max_distance
+        self.classes, label_ids = np.unique(np.asarray(labels), return_inverse=True)
+        features = np.asarray(features, dtype=np.float32)
+
+        if mode == 'centroid':
+            counts = np.bincount(label_ids, minlength=len(self.classes)).astype(np.float32)
+            sums = np.zeros((len(self.classes), features.shape[1]), np.float32)
+            np.add.at(sums, label_ids, features)
+            self._points = sums / counts[:, None]
+            self._point_labels = np.arange(len(self.classes))
+        else:
+            self._points = features
+            self._point_labels = label_ids
+        self._sq_norms = np.einsum('ij,ij->i', self._points, self._points)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _distances(self, features: np.ndarray) -> np.ndarray:
+        # |a - b|^2 = |a|^2 - 2ab + |b|^2 for every query/exemplar pair at once
+        sq = np.einsum('ij,ij->i', features, features)[:, None] - 2 * features @ self._points.T + self._sq_norms
+        return np.sqrt(np.maximum(sq, 0))
+
+    def classify(self, features: np.ndarray) -> Tuple[List[Optional[str]], np.ndarray]:
+        """Labels (None when rejected) and match distances for N x FEATURE_SIZE features"""
+        features = np.asarray(features, dtype=np.float32).reshape(-1, self._points.shape[1])
+        if not len(features):
+            return [], np.empty(0, np.float32)
+
+        distances = self._distances(features)
+        if self.mode == 'centroid':
+            label_ids = np.argmin(distances, axis=1)
+            best = distances[np.arange(len(features)), label_ids]
+        else:
+            k = min(self.k, len(self._points))
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            votes = self._point_labels[nearest]
+            # Majority vote over the k neighbours, ties broken by the lower label id
+            counts = np.zeros((len(features), len(self.classes)), np.int32)
+            np.add.at(counts, (np.arange(len(features))[:, None], votes), 1)
+            label_ids = np.argmax(counts, axis=1)
+            best = np.take_along_axis(distances, nearest, axis=1).min(axis=1)
+
+        labels = [str(self.classes[i]) for i in label_ids]
+        if self.max_distance is not None:
+            labels = [label if distance <= self.max_distance else None
+                      for label, distance in zip(labels, best)]
+        return labels, best
+
+    def save(self, path: Path):
+        np.savez_compressed(
+            path, points=self._points, point_labels=self.classes[self._point_labels],
+            mode=self.mode, k=self.k, max_distance=np.nan if self.max_distance is None else self.max_distance
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> 'ExemplarIndex':
+        data = np.load(path, allow_pickle=False)
+        max_distance = float(data['max_distance'])
+        # A saved centroid index already holds one point per label
+        return cls(data['points'], data['point_labels'], mode=str(data['mode']), k=int(data['k']),
+                   max_distance=None if np.isnan(max_distance) else max_distance)
+
+    def stats(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'classes': len(self.classes),
+            'exemplars': len(self._points),
+            'max_distance': self.max_distance
+        }
+
+
+def classify_thumb_index(points: np.ndarray) -> List[str]:
+    """Fallback rule without an index: thumb tip above the index tip is LOOP, otherwise VARIABLE"""
+    points = np.asarray(points).reshape(-1, NUM_LANDMARKS, 3)
+    loop = points[:, THUMB_TIP, 1] < points[:, INDEX_FINGER_TIP, 1]
+    return np.where(loop, 'LOOP', 'VARIABLE').tolist()
@@ -0,0 +1,244 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond decode work up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    metric_type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            # Unlabelled metrics are exported as zero before their first update
+            self.labels()
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        return self.labels()
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+        for values, child in self._children.items():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f'{self.name}{_format_labels(self.labelnames, values)} {child.value}']
+
+
+class _Value:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+
+class Counter(_Metric):
+    """Monotonic counter. Updates are plain attribute increments on the event loop."""
+    metric_type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+
+class _CounterChild(_Value):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at scrape time"""
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        self.callback = callback
+        super().__init__(name, documentation)
+
+    def _new_child(self):
+        return _Value()
+
+    def render(self) -> List[str]:
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.metric_type}',
+            f'{self.name} {self.callback()}'
+        ]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; an observation is one bisect and two additions"""
+    metric_type = 'histogram'
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def _render_child(self, values, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{bound}"')
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, values, 'le="+Inf"')
+        lines.append(f'{self.name}_bucket{labels} {child.count}')
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {child.sum}')
+        lines.append(f'{self.name}_count{labels} {child.count}')
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+STAGE_LATENCY = registry.register(Histogram(
+    'sign_language_stage_seconds',
+    'Time spent in each frame-processing stage',
+    labelnames=('stage',)
+))
+FRAMES_RECEIVED = registry.register(Counter(
+    'sign_language_frames_received_total',
+    'Frames received from clients'
+))
+FRAMES_DROPPED = registry.register(Counter(
+    'sign_language_frames_dropped_total',
+    'Frames dropped before decoding because a newer frame arrived'
+))
+FRAMES_RECOGNIZED = registry.register(Counter(
+    'sign_language_frames_recognized_total',
+    'Frames the recognizer ran on and found a gesture in (motion-skipped frames are not counted)'
+))
+FRAMES_MOTION_SKIPPED = registry.register(Counter(
+    'sign_language_frames_motion_skipped_total',
+    'Frames that skipped recognition because nothing moved since the last recognized frame'
+))
+GESTURES_COMMITTED = registry.register(Counter(
+    'sign_language_gestures_committed_total',
+    'Gesture transitions committed after hysteresis and debounce'
+))
+LLM_CALLS = registry.register(Counter(
+    'code_generator_llm_calls_total',
+    'Code generation requests sent to the LLM'
+))
+LLM_ERRORS = registry.register(Counter(
+    'code_generator_llm_errors_total',
+    'Code generation requests to the LLM that failed'
+))
+LLM_TIME_TO_FIRST_TOKEN = registry.register(Histogram(
+    'code_generator_llm_time_to_first_token_seconds',
+    'Time from sending a streamed LLM request to receiving its first code token'
+))
+LLM_COALESCED = registry.register(Counter(
+    'llm_requests_coalesced_total',
+    'LLM requests that joined an identical request already in flight, by service',
+    labelnames=('service',)
+))
+CODE_GENERATIONS_SUPERSEDED = registry.register(Counter(
+    'code_generator_superseded_total',
+    'Code generations cancelled because a newer gesture sequence was committed'
+))
+CODE_SYNTHESIZED = registry.register(Counter(
+    'code_generator_local_synthesis_total',
+    'Code generations composed locally from templates without calling the LLM'
+))
+CODE_CACHE_HITS = registry.register(Counter(
+    'code_generator_cache_hits_total',
+    'Code generations served from the cache, by tier',
+    labelnames=('tier',)
+))
+CODE_CACHE_MISSES = registry.register(Counter(
+    'code_generator_cache_misses_total',
+    'Code generations not found in the cache'
+))
+CODE_CACHE_EVICTIONS = registry.register(Counter(
+    'code_generator_cache_evictions_total',
+    'Cached code generations evicted from memory by the LRU limit'
+))
+
+
+def register_gauge(name: str, documentation: str, callback: Callable[[], float]) -> Gauge:
+    return registry.register(Gauge(name, documentation, callback))
@@ -0,0 +1,76 @@
+from typing import Dict, Optional, Tuple
+import cv2
+import numpy as np
+
+# Thumbnail used for frame differencing; tiny enough that comparing costs microseconds
+THUMBNAIL_SIZE = (32, 24)
+
+
+def motion_thumbnail(frame: np.ndarray) -> np.ndarray:
+    """Downsample a decoded frame to a small grayscale thumbnail"""
+    small = cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small
+
+
+def frame_difference(thumbnail: np.ndarray, reference: np.ndarray) -> float:
+    """Mean absolute pixel difference between two thumbnails (0-255)"""
+    return float(cv2.absdiff(thumbnail, reference).mean())
+
+
+def check_motion(frame: Optional[np.ndarray],
+                 reference: Optional[np.ndarray],
+                 threshold: float) -> Tuple[bool, Optional[np.ndarray]]:
+    """Decide whether a frame changed enough to be worth recognizing.
+
+    Returns (moved, thumbnail). Runs inside the frame executor.
+    """
+    if frame is None or threshold <= 0:
+        return True, None
+
+    thumbnail = motion_thumbnail(frame)
+    if reference is None or reference.shape != thumbnail.shape:
+        return True, thumbnail
+    return frame_difference(thumbnail, reference) >= threshold, thumbnail
+
+
+class MotionGate:
+    """Per-session motion gate state.
+
+    Holds the thumbnail of the last frame that was actually recognized. New
+    frames are compared against it rather than the immediately preceding
+    frame, so slow drift still adds up and eventually triggers recognition.
+    """
+
+    def __init__(self, threshold: float = 4.0):
+        self.threshold = threshold
+        self.reference: Optional[np.ndarray] = None
+        self.checked = 0
+        self.skipped = 0
+
+    def update(self, moved: bool, thumbnail: Optional[np.ndarray]):
+        """Record the outcome of a motion check for one frame"""
+        self.checked += 1
+        if moved:
+            if thumbnail is not None:
+                self.reference = thumbnail
+        else:
+            self.skipped += 1
+
+    def reset(self):
+        self.reference = None
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.skipped / self.checked if self.checked else 0.0
+
+    def memory_usage(self) -> int:
+        return self.reference.nbytes if self.reference is not None else 0
+
+    def stats(self) -> Dict:
+        return {
+            'motion_threshold': self.threshold,
+            'motion_skipped': self.skipped,
+            'motion_skip_ratio': round(self.skip_ratio, 3)
+        }
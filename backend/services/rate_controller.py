@@ -0,0 +1,94 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Capture settings the client can be asked to use, cheapest first: (fps, (width, height))
+RATE_LEVELS: List[Tuple[int, Tuple[int, int]]] = [
+    (2, (320, 240)),
+    (3, (320, 240)),
+    (5, (320, 240)),
+    (5, (640, 480)),
+    (8, (640, 480)),
+    (10, (640, 480)),
+    (15, (640, 480))
+]
+DEFAULT_LEVEL = 3  # 5 fps at 640x480, what the client used before negotiation
+
+
+class AdaptiveRateController:
+    """Chooses a client capture rate from a session's processing latency and drops.
+
+    Latency is tracked as an exponentially weighted moving average. The session
+    steps down a level when frames take longer than the target share of the
+    frame interval or start getting dropped, and steps up when there is ample
+    headroom. A cooldown between changes keeps the client from oscillating.
+    """
+
+    def __init__(self,
+                 levels: List[Tuple[int, Tuple[int, int]]] = RATE_LEVELS,
+                 initial_level: int = DEFAULT_LEVEL,
+                 target_utilization: float = 0.7,
+                 smoothing: float = 0.2,
+                 cooldown: float = 2.0):
+        self.levels = levels
+        self.level = min(initial_level, len(levels) - 1)
+        self.target_utilization = target_utilization
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.avg_latency: Optional[float] = None
+        self._last_dropped = 0
+        self._last_change = time.monotonic()
+
+    @property
+    def target_fps(self) -> int:
+        return self.levels[self.level][0]
+
+    @property
+    def target_resolution(self) -> Tuple[int, int]:
+        return self.levels[self.level][1]
+
+    def observe(self, latency: float, dropped: int, queue_depth: int = 0) -> Optional[Dict]:
+        """Record one processed frame; returns a control message if the target changed"""
+        if self.avg_latency is None:
+            self.avg_latency = latency
+        else:
+            self.avg_latency += self.smoothing * (latency - self.avg_latency)
+
+        now = time.monotonic()
+        if now - self._last_change < self.cooldown:
+            return None
+
+        # Drops are counted across the whole cooldown window
+        new_drops = dropped - self._last_dropped
+        self._last_dropped = dropped
+
+        budget = self.target_utilization / self.target_fps
+        overloaded = new_drops > 0 or queue_depth > 0 or self.avg_latency > budget
+        if overloaded:
+            if self.level == 0:
+                return None
+            self.level -= 1
+        else:
+            if self.level == len(self.levels) - 1:
+                return None
+            # Only step up if the next level would still leave ample headroom
+            next_budget = self.target_utilization / self.levels[self.level + 1][0]
+            if self.avg_latency >= next_budget * 0.5:
+                return None
+            self.level += 1
+
+        self._last_change = now
+        return self.control_message()
+
+    def control_message(self) -> Dict:
+        width, height = self.target_resolution
+        return {
+            'type': 'rate_control',
+            'target_fps': self.target_fps,
+            'target_resolution': {'width': width, 'height': height}
+        }
+
+    def stats(self) -> Dict:
+        return {
+            'target_fps': self.target_fps,
+            'avg_latency_ms': round(self.avg_latency * 1000, 2) if self.avg_latency is not None else None
+        }
@@ -0,0 +1,57 @@
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+
+class RecognizerBackend:
+    """Common interface for gesture recognition backends.
+
+    Backends classify decoded frames into gesture names (None for no gesture)
+    and must not keep per-session state in ``detect_gesture``, so one instance
+    can serve every session in a worker. Backends that track state across a
+    session's frames override the ``*_session_*`` methods instead.
+    """
+
+    name = 'base'
+    # Decoded input the backend wants, see services.frame_decoder
+    input_spec = {'color': 'bgr', 'size': None}
+    # True when detect_gestures() runs one vectorized call that is cheaper per frame than
+    # single calls, so frames from many sessions are worth holding back a moment to batch
+    batched = False
+
+    load_seconds: Optional[float] = None
+    warmup_seconds: Optional[float] = None
+
+    def detect_gesture(self, frame: Optional[np.ndarray]) -> Optional[str]:
+        raise NotImplementedError
+
+    def detect_gestures(self, frames: List[Optional[np.ndarray]]) -> List[Optional[str]]:
+        return [self.detect_gesture(frame) for frame in frames]
+
+    def detect_session_gesture(self, session_id: Optional[str], frame: Optional[np.ndarray]) -> Optional[str]:
+        return self.detect_gesture(frame)
+
+    def detect_session_gestures(self, session_ids: List[Optional[str]],
+                                frames: List[Optional[np.ndarray]]) -> List[Optional[str]]:
+        return self.detect_gestures(frames)
+
+    def release_session(self, session_id: str):
+        """Drop any state kept for a session that has ended"""
+
+    def warm_up(self) -> float:
+        """Run one blank frame through the backend so first-frame latency is paid up front"""
+        width, height = self.input_spec.get('size') or (640, 480)
+        shape = (height, width) if self.input_spec.get('color') == 'gray' else (height, width, 3)
+        start = time.perf_counter()
+        self.detect_gesture(np.zeros(shape, np.uint8))
+        self.warmup_seconds = time.perf_counter() - start
+        return self.warmup_seconds
+
+    def cost(self) -> Dict:
+        """Report what this backend costs to load and to run on one frame"""
+        return {
+            'name': self.name,
+            'batched': self.batched,
+            'load_ms': round(self.load_seconds * 1000, 2) if self.load_seconds is not None else None,
+            'frame_ms': round(self.warmup_seconds * 1000, 3) if self.warmup_seconds is not None else None
+        }
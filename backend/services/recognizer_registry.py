@@ -0,0 +1,87 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, List
+from services.recognizer_base import RecognizerBackend
+
+logger = logging.getLogger(__name__)
+
+# Backends are referenced by import path so heavy dependencies (MediaPipe,
+# TensorFlow) are only imported when a connection first asks for them.
+RECOGNIZER_BACKENDS: Dict[str, str] = {
+    'brightness': 'services.gesture_recognition:GestureRecognizer',
+    'mediapipe': 'services.sign_language_recognition:SignLanguageRecognizer',
+    'cnn': 'services.cnn_recognition:CNNGestureRecognizer',
+    'cnn_tflite': 'services.cnn_recognition:TFLiteGestureRecognizer'
+}
+# Backends whose frames are micro-batched across sessions (their class sets ``batched``). Kept
+# here as static metadata so the per-frame scheduling decision never imports a backend.
+BATCHED_RECOGNIZERS = {'cnn', 'cnn_tflite'}
+DEFAULT_RECOGNIZER = 'brightness'
+
+_instances: Dict[str, RecognizerBackend] = {}
+_lock = threading.Lock()
+
+
+def register_recognizer(name: str, target: str, batched: bool = False):
+    """Register a backend as 'package.module:ClassName'"""
+    RECOGNIZER_BACKENDS[name] = target
+    if batched:
+        BATCHED_RECOGNIZERS.add(name)
+    else:
+        BATCHED_RECOGNIZERS.discard(name)
+
+
+def available_recognizers() -> List[str]:
+    return list(RECOGNIZER_BACKENDS)
+
+
+def is_registered(name: str) -> bool:
+    return name in RECOGNIZER_BACKENDS
+
+
+def recognizer_class(name: str) -> type:
+    """Import a backend's class without instantiating (or loading a model for) it"""
+    if name not in RECOGNIZER_BACKENDS:
+        raise ValueError(f"Unknown recognizer '{name}', expected one of {available_recognizers()}")
+    module_name, _, class_name = RECOGNIZER_BACKENDS[name].partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def is_batched(name: str) -> bool:
+    """Whether a backend's frames are worth micro-batching across sessions; a set lookup, no import"""
+    return name in BATCHED_RECOGNIZERS
+
+
+def get_recognizer(name: str = DEFAULT_RECOGNIZER) -> RecognizerBackend:
+    """Return this process's instance of a backend, importing and warming it on first use"""
+    recognizer = _instances.get(name)
+    if recognizer is not None:
+        return recognizer
+
+    with _lock:
+        recognizer = _instances.get(name)
+        if recognizer is None:
+            start = time.perf_counter()
+            recognizer = recognizer_class(name)()
+            recognizer.load_seconds = time.perf_counter() - start
+            recognizer.warm_up()
+            logger.info(f"Loaded recognizer '{name}' in {recognizer.load_seconds:.2f}s")
+            if recognizer.batched != is_batched(name):
+                logger.warning(f"Recognizer '{name}' has batched={recognizer.batched} but is "
+                               f"{'' if is_batched(name) else 'not '}registered as batched")
+            _instances[name] = recognizer
+    return recognizer
+
+
+def loaded_recognizers() -> Dict[str, Dict]:
+    """Cost report for every backend loaded in this process"""
+    return {name: recognizer.cost() for name, recognizer in _instances.items()}
+
+
+def release_recognizer_session(name: str, session_id: str):
+    """Let a loaded backend drop per-session state; a no-op if it was never loaded here"""
+    recognizer = _instances.get(name)
+    if recognizer is not None:
+        recognizer.release_session(session_id)
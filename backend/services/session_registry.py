@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+from services.frame_queue import LatestFrameQueue
+from services.gesture_recognition import GestureRecognizer
+from services.gesture_state import GestureStateMachine
+from services.motion_gate import MotionGate
+from services.rate_controller import AdaptiveRateController
+from services.recognizer_registry import DEFAULT_RECOGNIZER
+
+logger = logging.getLogger(__name__)
+
+
+class RecognitionSession:
+    """State owned by a single connection: gesture sequence, recognizer and frame queue"""
+
+    def __init__(self,
+                 session_id: str,
+                 user_id: Optional[str] = None,
+                 max_sequence_length: int = 5,
+                 frame_queue_size: int = 1,
+                 motion_threshold: float = 4.0,
+                 hysteresis_frames: int = 3,
+                 debounce_ms: float = 500.0):
+        self.session_id = session_id
+        # Several connections may share a user id (e.g. "guest"); they never share a session
+        self.user_id = user_id if user_id is not None else session_id
+        self.recognizer = GestureRecognizer(max_sequence_length=max_sequence_length)
+        self.frame_queue = LatestFrameQueue(maxsize=frame_queue_size)
+        self.rate_controller = AdaptiveRateController()
+        self.motion_gate = MotionGate(threshold=motion_threshold)
+        # Recognition backend name, chosen per connection
+        self.backend = DEFAULT_RECOGNIZER
+        self.gesture_state = GestureStateMachine(hysteresis_frames=hysteresis_frames, debounce_ms=debounce_ms)
+        # Background code generation for the latest committed sequence, superseded by newer ones
+        self.code_task: Optional[asyncio.Task] = None
+        self.code_generation = 0
+        self.created_at = time.monotonic()
+        self.last_active = self.created_at
+        self.connections = 0
+
+    @property
+    def gesture_sequence(self) -> List[str]:
+        return list(self.recognizer.gesture_sequence)
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def cancel_code_generation(self) -> bool:
+        """Cancel the running code generation, if any; True when one was still in progress"""
+        task, self.code_task = self.code_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            return True
+        return False
+
+    def idle_seconds(self, now: Optional[float] = None) -> float:
+        return (now or time.monotonic()) - self.last_active
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by this session's mutable state"""
+        sequence = self.recognizer.gesture_sequence
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.recognizer)
+            + sys.getsizeof(sequence)
+            + sum(sys.getsizeof(gesture) for gesture in sequence)
+            + self.frame_queue.memory_usage()
+            + self.motion_gate.memory_usage()
+            + self.gesture_state.memory_usage()
+        )
+
+    def stats(self) -> Dict:
+        return {
+            **self.frame_queue.stats(),
+            **self.rate_controller.stats(),
+            **self.motion_gate.stats(),
+            **self.gesture_state.stats(),
+            'user_id': self.user_id,
+            'connections': self.connections,
+            'backend': self.backend,
+            'code_generation': self.code_generation,
+            'gesture_sequence': self.gesture_sequence,
+            'idle_seconds': round(self.idle_seconds(), 3),
+            'memory_bytes': self.memory_usage()
+        }
+
+
+class SessionRegistry:
+    """Creates recognition sessions lazily and evicts them once idle"""
+
+    def __init__(self,
+                 idle_timeout: float = 300.0,
+                 max_sequence_length: int = 5,
+                 frame_queue_size: int = 1,
+                 motion_threshold: float = 4.0,
+                 hysteresis_frames: int = 3,
+                 debounce_ms: float = 500.0):
+        self.idle_timeout = idle_timeout
+        self.max_sequence_length = max_sequence_length
+        self.frame_queue_size = frame_queue_size
+        self.motion_threshold = motion_threshold
+        self.hysteresis_frames = hysteresis_frames
+        self.debounce_ms = debounce_ms
+        self._sessions: Dict[str, RecognitionSession] = {}
+
+    def create(self, user_id: str) -> RecognitionSession:
+        """A new session for one connection of ``user_id``"""
+        session_id = f"{user_id}:{uuid.uuid4().hex[:12]}"
+        session = RecognitionSession(
+            session_id,
+            user_id=user_id,
+            max_sequence_length=self.max_sequence_length,
+            frame_queue_size=self.frame_queue_size,
+            motion_threshold=self.motion_threshold,
+            hysteresis_frames=self.hysteresis_frames,
+            debounce_ms=self.debounce_ms
+        )
+        self._sessions[session_id] = session
+        logger.info(f"Created recognition session {session_id}")
+        return session
+
+    def get(self, session_id: str) -> Optional[RecognitionSession]:
+        return self._sessions.get(session_id)
+
+    def attach(self, user_id: str, resume: Optional[str] = None) -> RecognitionSession:
+        """Session for a new connection, marked as in use.
+
+        ``resume`` names a previous session of the same user to continue
+        (e.g. after a reconnect); it is only reused while no other
+        connection holds it. Otherwise every connection gets its own
+        session, so connections sharing a user id never see each other's
+        frames, gestures or results.
+        """
+        session = self._sessions.get(resume) if resume else None
+        if session is None or session.user_id != user_id or session.connections > 0:
+            session = self.create(user_id)
+        session.connections += 1
+        session.touch()
+        return session
+
+    def detach(self, session: RecognitionSession):
+        session.connections = max(0, session.connections - 1)
+        session.touch()
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """Drop sessions with no open connection that have been idle past the timeout"""
+        now = now or time.monotonic()
+        expired = [
+            session_id for session_id, session in self._sessions.items()
+            if session.connections == 0 and session.idle_seconds(now) >= self.idle_timeout
+        ]
+        for session_id in expired:
+            del self._sessions[session_id]
+            logger.info(f"Evicted idle recognition session {session_id}")
+        return expired
+
+    async def run_eviction(self, interval: Optional[float] = None):
+        """Periodically evict idle sessions until cancelled"""
+        interval = interval or max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    def memory_usage(self) -> int:
+        return sum(session.memory_usage() for session in self._sessions.values())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict:
+        return {
+            'sessions': {session_id: session.stats() for session_id, session in self._sessions.items()},
+            'total_sessions': len(self._sessions),
+            'total_memory_bytes': self.memory_usage()
+        }
@@ -1,117 +1,232 @@
 import mediapipe as mp
 import cv2
 import numpy as np
-from typing import Dict, Optional
+import os
+import time
+from typing import Dict, List, Optional
+from services.code_templates import DEFAULT_LANGUAGE, get_template
+from services.dynamic_gestures import DEFAULT_TEMPLATES_PATH, LandmarkWindow, TemplateLibrary
+from services.hand_roi import HandRoiTracker
+from services.hands_pool import HandsPool
+from services.landmark_features import (
+    DEFAULT_INDEX_PATH,
+    ExemplarIndex,
+    classify_thumb_index,
+    landmark_features,
+    landmarks_to_array,
+)
+from services.recognizer_base import RecognizerBackend
 
-class SignLanguageRecognizer:
-    def __init__(self):
+# Hands graphs per worker: at most MEDIAPIPE_POOL_SIZE, MEDIAPIPE_POOL_WARM created up front,
+# and a session's graph is reclaimed after MEDIAPIPE_POOL_IDLE_TIMEOUT seconds without frames
+POOL_SIZE = int(os.getenv('MEDIAPIPE_POOL_SIZE', '4'))
+POOL_WARM = int(os.getenv('MEDIAPIPE_POOL_WARM', '1'))
+POOL_IDLE_TIMEOUT = float(os.getenv('MEDIAPIPE_POOL_IDLE_TIMEOUT', '30'))
+# Once a hand is found, only the padded area around it is searched, downscaled to at most
+# MEDIAPIPE_ROI_SIZE pixels per side; 0 always searches the full frame
+ROI_SIZE = int(os.getenv('MEDIAPIPE_ROI_SIZE', '256'))
+ROI_PADDING = float(os.getenv('MEDIAPIPE_ROI_PADDING', '0.6'))
+# Dynamic gestures are matched over the last DTW_WINDOW_FRAMES hand frames, spending at most
+# about DTW_BUDGET_MS per frame on the template library
+DTW_WINDOW_FRAMES = int(os.getenv('DTW_WINDOW_FRAMES', '16'))
+DTW_BUDGET_MS = float(os.getenv('DTW_BUDGET_MS', '5'))
+
+
+class HandSessionState:
+    """Per-session tracking, kept by the pool apart from whichever graph the session runs on"""
+
+    def __init__(self, roi: Optional[HandRoiTracker], window: Optional[LandmarkWindow]):
+        self.roi = roi
+        self.window = window
+        # Crop region (None for the full frame) the session's graph last tracked the hand in
+        self.view = None
+
+    def reset(self):
+        self.view = None
+        if self.roi is not None:
+            self.roi.reset()
+        if self.window is not None:
+            self.window.reset()
+
+    def stats(self) -> Dict:
+        return {
+            'roi': self.roi.stats() if self.roi is not None else None,
+            'window_frames': len(self.window) if self.window is not None else None
+        }
+
+
+class SignLanguageRecognizer(RecognizerBackend):
+    name = 'mediapipe'
+    # MediaPipe needs full-resolution color frames
+    input_spec = {'color': 'bgr', 'size': None}
+
+    def __init__(self, pool_size: int = POOL_SIZE, pool_warm: int = POOL_WARM,
+                 pool_idle_timeout: float = POOL_IDLE_TIMEOUT, index_path: str = DEFAULT_INDEX_PATH,
+                 templates_path: str = DEFAULT_TEMPLATES_PATH):
         # Initialize MediaPipe
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        # Tracking mode keeps state between frames, so each session gets its own graph
+        self.hands_pool = HandsPool(
+            self._create_hands,
+            max_size=pool_size,
+            min_idle=pool_warm,
+            idle_timeout=pool_idle_timeout,
+            state_factory=self._create_session_state,
+            static_factory=self._create_static_hands
+        )
+        
+        # Landmark exemplars built by build_landmark_index.py; without them the thumb/index rule is used
+        self.landmark_index = ExemplarIndex.load(index_path) if os.path.exists(index_path) else None
+        # Motion templates built by build_gesture_templates.py; without them only static poses are recognized
+        self.template_library = TemplateLibrary.load(templates_path) if os.path.exists(templates_path) else None
+        
+        print("SignLanguageRecognizer initialized successfully")
+
+    def _create_hands(self):
+        return self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=2,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.5
         )
-        
-        # Define gesture mappings
-        self.gesture_mappings = {
-            'LOOP_GESTURE': {
-                'name': 'For Loop',
-                'command': 'for (let i = 0; i < 10; i++) {\n    // Your code here\n}',
-                'description': 'Creates a for loop'
-            },
-            'IF_GESTURE': {
-                'name': 'If Statement',
-                'command': 'if (condition) {\n    // Your code here\n}',
-                'description': 'Creates an if statement'
-            },
-            'FUNCTION_GESTURE': {
-                'name': 'Function',
-                'command': 'function myFunction() {\n    // Your code here\n}',
-                'description': 'Creates a function'
-            },
-            'VARIABLE_GESTURE': {
-                'name': 'Variable',
-                'command': 'let myVariable = "";',
-                'description': 'Declares a variable'
-            }
+
+    def _create_static_hands(self):
+        # Shared by sessions that find every tracking graph in use; keeps no state between frames
+        return self.mp_hands.Hands(
+            static_image_mode=True,
+            max_num_hands=2,
+            min_detection_confidence=0.7
+        )
+
+    def _create_session_state(self) -> HandSessionState:
+        return HandSessionState(
+            HandRoiTracker(padding=ROI_PADDING, max_side=ROI_SIZE) if ROI_SIZE > 0 else None,
+            LandmarkWindow(DTW_WINDOW_FRAMES) if self.template_library is not None else None
+        )
+
+    def warm_up(self) -> float:
+        """Build the warm pool instances and time a blank frame through them"""
+        timings = self.hands_pool.warm_up()
+        self.warmup_seconds = max(timings) if timings else super().warm_up()
+        return self.warmup_seconds
+
+    def release_session(self, session_id: str):
+        self.hands_pool.release(session_id)
+
+    def cost(self) -> Dict:
+        return {
+            **super().cost(),
+            'hands_pool': self.hands_pool.stats(),
+            'landmark_index': self.landmark_index.stats() if self.landmark_index is not None else None,
+            'template_library': self.template_library.stats() if self.template_library is not None else None
         }
-        
-        print("SignLanguageRecognizer initialized successfully")
 
-    def process_frame(self, frame: np.ndarray, language: str = 'javascript') -> Dict:
+    def detect_gesture(self, frame: Optional[np.ndarray]) -> Optional[str]:
+        """Classify a frame into a gesture name shared with the other backends."""
+        return self.detect_session_gesture(None, frame)
+
+    def detect_session_gesture(self, session_id: Optional[str], frame: Optional[np.ndarray]) -> Optional[str]:
+        return self.detect_session_gestures([session_id], [frame])[0]
+
+    def detect_session_gestures(self, session_ids: List[Optional[str]],
+                                frames: List[Optional[np.ndarray]]) -> List[Optional[str]]:
+        # MediaPipe runs per frame; every hand found is then classified in one call
+        hands, dynamic = [], []
+        for session_id, frame in zip(session_ids, frames):
+            if frame is None:
+                hands.append(None)
+                dynamic.append(None)
+                continue
+            state = self.hands_pool.session_state(session_id)
+            with self.hands_pool.checkout(session_id) as instance:
+                points = self._find_hands(instance, state, frame)
+            hands.append(points)
+            dynamic.append(self._match_dynamic(state, points))
+
+        # A completed movement takes precedence over the pose of its last frame
+        return [motion or pose for motion, pose in zip(dynamic, self._classify(hands))]
+
+    def process_frame(self, frame: np.ndarray, language: str = DEFAULT_LANGUAGE) -> Dict:
         """Process a video frame and return detected gesture and code."""
-        if frame is None:
+        # Detect gesture based on hand landmarks
+        gesture = self.detect_gesture(frame)
+        
+        # Precompiled per-language template, looked up by (gesture, language)
+        template = get_template(gesture, language) if gesture is not None else None
+        if template is None:
             return self._create_response('NO_GESTURE', 0.0)
+        
+        return self._create_response(f'{gesture}_GESTURE', 0.95, template)
 
+    def _find_hands(self, instance, state: HandSessionState, frame: np.ndarray) -> Optional[np.ndarray]:
+        """H x 21 x 3 landmarks in full-frame coordinates, searching the session's ROI first."""
+        tracker = state.roi
+        region = tracker.region(frame.shape) if tracker is not None else None
+        if region is not None:
+            self._set_view(instance, state, region)
+            start = time.perf_counter()
+            hands = self._process(instance, tracker.crop(frame, region))
+            seconds = time.perf_counter() - start
+            if hands is not None:
+                hands = tracker.to_frame(hands, region, frame.shape)
+                tracker.update(hands[0], from_roi=True, seconds=seconds)
+                return hands
+            tracker.update(None, from_roi=True, seconds=seconds)
+
+        # Not tracking or the hand left the ROI: search the whole frame
+        self._set_view(instance, state, None)
+        start = time.perf_counter()
+        hands = self._process(instance, frame)
+        if tracker is not None:
+            tracker.update(hands[0] if hands is not None else None, from_roi=False,
+                           seconds=time.perf_counter() - start)
+        return hands
+
+    def _set_view(self, instance, state: HandSessionState, region):
+        """Reset graph tracking when the image it sees switches between crop windows or to the full frame"""
+        if region != state.view:
+            # Tracking mode reuses the previous frame's landmarks as this frame's ROI, which
+            # only holds while consecutive images show the same view
+            instance.reset()
+            state.view = region
+
+    def _process(self, instance, frame: np.ndarray) -> Optional[np.ndarray]:
         # Convert BGR to RGB
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process the frame
-        results = self.hands.process(rgb_frame)
-        
+        results = instance.process(rgb_frame)
         if not results.multi_hand_landmarks:
-            return self._create_response('NO_GESTURE', 0.0)
+            return None
+        return landmarks_to_array(results.multi_hand_landmarks)
 
-        # Get hand landmarks
-        landmarks = results.multi_hand_landmarks[0]
-        
-        # Detect gesture based on landmarks
-        gesture = self._detect_gesture(landmarks)
-        
-        # Get code template based on language
-        code = self._get_code_template(gesture, language)
-        
-        return self._create_response(gesture, 0.95, code)
-
-    def _detect_gesture(self, landmarks) -> str:
-        """Detect gesture from landmarks."""
-        # Example gesture detection logic
-        # This should be replaced with your actual gesture detection model
-        thumb_tip = landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-        index_tip = landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        
-        # Simple example: if thumb is above index finger, it's a loop gesture
-        if thumb_tip.y < index_tip.y:
-            return 'LOOP_GESTURE'
-        return 'VARIABLE_GESTURE'
-
-    def _get_code_template(self, gesture: str, language: str) -> str:
-        """Get code template based on gesture and programming language."""
-        if gesture not in self.gesture_mappings:
-            return '// No gesture detected'
-            
-        template = self.gesture_mappings[gesture]['command']
-        
-        # Convert template to specified language
-        if language == 'python':
-            template = self._convert_to_python(template)
-        
-        return template
-
-    def _convert_to_python(self, js_code: str) -> str:
-        """Convert JavaScript code template to Python."""
-        # Simple conversion examples
-        conversions = {
-            'for (let i = 0; i < 10; i++)': 'for i in range(10):',
-            'if (condition)': 'if condition:',
-            'function': 'def',
-            'let': '',
-            '{': ':',
-            '}': '',
-            '// ': '# '
-        }
-        
-        result = js_code
-        for js, py in conversions.items():
-            result = result.replace(js, py)
-        
-        return result
+    def _match_dynamic(self, state: HandSessionState, hands: Optional[np.ndarray]) -> Optional[str]:
+        """Match the session's landmark window against the motion templates once it is full."""
+        if state.window is None or not state.window.push(hands[0] if hands is not None else None):
+            return None
+        gesture, _ = self.template_library.match(state.window.array(), budget_ms=DTW_BUDGET_MS)
+        return gesture
+
+    def _classify(self, hands: List[Optional[np.ndarray]]) -> List[Optional[str]]:
+        """Gesture per frame from its detected hands, picking the closest match when several hands are seen."""
+        gestures: List[Optional[str]] = [None] * len(hands)
+        owners = [i for i, points in enumerate(hands) if points is not None for _ in range(len(points))]
+        if not owners:
+            return gestures
 
-    def _create_response(self, gesture: str, confidence: float, code: Optional[str] = None) -> Dict:
+        points = np.concatenate([points for points in hands if points is not None])
+        if self.landmark_index is None:
+            labels, distances = classify_thumb_index(points), np.zeros(len(points))
+        else:
+            labels, distances = self.landmark_index.classify(landmark_features(points))
+
+        best = [np.inf] * len(hands)
+        for owner, label, distance in zip(owners, labels, distances):
+            if label is not None and distance < best[owner]:
+                gestures[owner], best[owner] = label, distance
+        return gestures
+
+    def _create_response(self, gesture: str, confidence: float, template: Optional[Dict] = None) -> Dict:
         """Create standardized response dictionary."""
-        if gesture not in self.gesture_mappings:
+        if template is None:
             return {
                 'gesture_name': 'NO_GESTURE',
                 'confidence': 0.0,
@@ -122,6 +237,6 @@ class SignLanguageRecognizer:
         return {
             'gesture_name': gesture,
             'confidence': confidence,
-            'command': code or self.gesture_mappings[gesture]['command'],
-            'description': self.gesture_mappings[gesture]['description']
-        }
\ No newline at end of file
+            'command': template['command'],
+            'description': template['description']
+        }
@@ -0,0 +1,68 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+from services.metrics import LLM_COALESCED
+
+
+def prompt_key(*parts: Any) -> str:
+    """Stable hash of everything that determines an upstream request"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces identical concurrent async calls into one in-flight task.
+
+    The first caller for a key starts the call; callers arriving while it
+    runs await the same task and get its result or its exception. A caller
+    that is cancelled only stops waiting; the shared call is cancelled once
+    no caller is left waiting on it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _, key=key, task=task: self._forget(key, task))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+            LLM_COALESCED.labels(self.name).inc()
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1:
+                task.cancel()
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter was cancelled
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': len(self._calls),
+            'calls': self.calls,
+            'coalesced': self.coalesced
+        }
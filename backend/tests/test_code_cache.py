@@ -0,0 +1,100 @@
+import asyncio
+from services import code_cache
+from services.code_cache import CodeCache, cache_key
+
+RESULT = {'status': 'success', 'code': 'for (let i = 0; i < 10; i++) {}'}
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_key_normalizes_gestures_and_language():
+    assert cache_key([' loop', 'If'], 'JavaScript ', 1) == cache_key(['LOOP', 'IF'], 'javascript', 1)
+    assert cache_key(['LOOP'], 'python', 1) != cache_key(['LOOP'], 'python', 2)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(code_cache.time, 'time', clock)
+    cache = CodeCache(ttl=60)
+    cache.set('key', RESULT)
+
+    clock.now += 59
+    assert cache.get('key') == RESULT
+    clock.now += 2
+    assert cache.get('key') is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = CodeCache(max_entries=2)
+    cache.set('a', {'code': 'a'})
+    cache.set('b', {'code': 'b'})
+    cache.get('a')
+    cache.set('c', {'code': 'c'})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'code': 'a'}
+    assert cache.get('c') == {'code': 'c'}
+    assert cache.stats()['evictions'] == 1
+
+
+def test_sqlite_store_survives_restart_and_promotes_to_memory(tmp_path):
+    path = str(tmp_path / 'code_cache.db')
+    cache = CodeCache(path=path)
+    cache.set('key', RESULT)
+    cache.close()
+
+    reopened = CodeCache(path=path)
+    assert len(reopened) == 0
+    assert reopened.get('key') == RESULT
+    assert reopened.get('key') == RESULT
+    stats = reopened.stats()
+    assert (stats['disk_hits'], stats['hits'], stats['entries']) == (1, 1, 1)
+    reopened.close()
+
+
+def test_expired_rows_are_not_read_from_sqlite(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(code_cache.time, 'time', clock)
+    path = str(tmp_path / 'code_cache.db')
+    cache = CodeCache(ttl=60, path=path)
+    cache.set('key', RESULT)
+    cache.close()
+
+    clock.now += 61
+    reopened = CodeCache(ttl=60, path=path)
+    assert reopened.get('key') is None
+    reopened.close()
+
+
+def test_clear_empties_memory_and_disk(tmp_path):
+    path = str(tmp_path / 'code_cache.db')
+    cache = CodeCache(path=path)
+    cache.set('key', RESULT)
+    cache.clear()
+    assert cache.get('key') is None
+    cache.close()
+
+
+def test_async_lookups_share_the_sqlite_store(tmp_path):
+    path = str(tmp_path / 'code_cache.db')
+
+    async def main():
+        cache = CodeCache(path=path)
+        await cache.aset('key', RESULT)
+        cache.close()
+
+        reopened = CodeCache(path=path)
+        results = [await reopened.aget('key'), await reopened.aget('key'), await reopened.aget('other')]
+        reopened.close()
+        return results, reopened.stats()
+
+    results, stats = asyncio.run(main())
+    assert results == [RESULT, RESULT, None]
+    assert (stats['disk_hits'], stats['hits'], stats['misses']) == (1, 1, 1)
@@ -0,0 +1,31 @@
+import ast
+import itertools
+from services.code_synthesizer import synthesize
+from services.code_templates import GESTURES
+
+
+def test_blocks_wrap_the_gestures_that_follow():
+    assert synthesize(['LOOP', 'VARIABLE'], 'python') == 'for i in range(10):\n    my_variable = ""'
+
+
+def test_repeated_gestures_get_fresh_identifiers():
+    code = synthesize(['LOOP', 'LOOP', 'VARIABLE', 'VARIABLE'], 'java')
+    assert 'int i = 0' in code and 'int j = 0' in code
+    assert 'String myVariable = ""' in code and 'String myVariable2 = ""' in code
+
+
+def test_java_method_inside_a_block_falls_back():
+    assert synthesize(['LOOP', 'FUNCTION'], 'java') is None
+    assert synthesize(['FUNCTION', 'LOOP'], 'java') is not None
+
+
+def test_unknown_gestures_and_languages_fall_back():
+    assert synthesize(['LOOP', 'WAVE'], 'python') is None
+    assert synthesize(['LOOP'], 'cobol') is None
+    assert synthesize([], 'python') is None
+
+
+def test_every_python_sequence_parses():
+    for length in range(1, 4):
+        for sequence in itertools.product(GESTURES, repeat=length):
+            ast.parse(synthesize(sequence, 'python'))
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from services.dynamic_gestures import LandmarkWindow, TemplateLibrary, banded_dtw, envelopes, lb_keogh
+
+
+def naive_dtw(query: np.ndarray, template: np.ndarray, band: int) -> float:
+    """Textbook squared-Euclidean DTW restricted to |i - j| <= band"""
+    length = len(query)
+    table = np.full((length + 1, length + 1), np.inf)
+    table[0, 0] = 0.0
+    for i in range(1, length + 1):
+        for j in range(max(1, i - band), min(length, i + band) + 1):
+            cost = float(np.sum((query[i - 1] - template[j - 1]) ** 2))
+            table[i, j] = cost + min(table[i - 1, j], table[i, j - 1], table[i - 1, j - 1])
+    return table[length, length]
+
+
+@pytest.mark.parametrize('band', [0, 1, 3, 31])
+def test_banded_dtw_matches_naive_dtw(band):
+    rng = np.random.default_rng(band)
+    query = rng.normal(size=(32, 6))
+    templates = rng.normal(size=(5, 32, 6))
+
+    distances = banded_dtw(query, templates, band, np.inf)
+    expected = [naive_dtw(query, template, band) for template in templates]
+    np.testing.assert_allclose(distances, expected, rtol=1e-9)
+
+
+def test_banded_dtw_abandons_candidates_above_best_so_far():
+    rng = np.random.default_rng(0)
+    query = rng.normal(size=(16, 4))
+    templates = np.stack([query + 0.01, query + 5.0])
+
+    exact = banded_dtw(query, templates, 2, np.inf)
+    pruned = banded_dtw(query, templates, 2, exact[0] * 2)
+    assert pruned[0] == pytest.approx(exact[0])
+    assert np.isinf(pruned[1])
+
+
+def test_lb_keogh_never_exceeds_dtw():
+    rng = np.random.default_rng(1)
+    query = rng.normal(size=(24, 3))
+    templates = rng.normal(size=(8, 24, 3))
+    upper, lower = envelopes(templates, 3)
+    assert np.all(lb_keogh(query, upper, lower) <= banded_dtw(query, templates, 3, np.inf) + 1e-9)
+
+
+def test_library_matches_the_nearest_template():
+    rng = np.random.default_rng(2)
+    base = rng.random((21, 3))
+    sequences, labels = [], []
+    for label, direction in (('SWIPE_RIGHT', (1, 0, 0)), ('SWIPE_DOWN', (0, 1, 0))):
+        sequences.append(np.array([base + np.array(direction) * 0.02 * t for t in range(20)]))
+        labels.append(label)
+    library = TemplateLibrary.from_sequences(sequences, labels)
+
+    window = sequences[1] + rng.normal(0, 0.001, sequences[1].shape)
+    gesture, distance = library.match(window)
+    assert gesture == 'SWIPE_DOWN'
+    assert np.isfinite(distance)
+
+
+def test_landmark_window_fills_and_resets_after_a_long_gap():
+    window = LandmarkWindow(size=3, max_gap=1)
+    points = np.zeros((21, 3))
+    assert [window.push(points) for _ in range(3)] == [False, False, True]
+    window.push(None)
+    window.push(None)
+    assert len(window) == 0
@@ -0,0 +1,48 @@
+import asyncio
+import os
+from services.batch_scheduler import BatchScheduler
+from services.frame_executor import FrameExecutor
+
+
+def pids(items):
+    return [os.getpid() for _ in items]
+
+
+def test_process_mode_pins_a_session_to_one_worker():
+    executor = FrameExecutor(mode='process', max_workers=3)
+
+    async def main():
+        return [await executor.run(os.getpid, key=f'session-{i % 4}') for i in range(12)]
+
+    try:
+        seen = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    for session in range(4):
+        assert len(set(seen[session::4])) == 1
+
+
+def test_batches_are_split_by_session_shard():
+    executor = FrameExecutor(mode='process', max_workers=2)
+    batcher = BatchScheduler(pids, executor, max_batch_size=8, max_wait_ms=50)
+    keys = [f'session-{i}' for i in range(6)]
+
+    async def main():
+        results = await asyncio.gather(*(batcher.submit(key, key=key) for key in keys))
+        await batcher.close()
+        return results
+
+    try:
+        results = asyncio.run(main())
+        expected = [asyncio.run(executor.run(os.getpid, key=key)) for key in keys]
+    finally:
+        executor.shutdown()
+    assert results == expected
+
+
+def test_thread_mode_ignores_keys():
+    executor = FrameExecutor(mode='thread', max_workers=2)
+    try:
+        assert executor.shard('a') == executor.shard('b') == 0
+    finally:
+        executor.shutdown()
@@ -0,0 +1,49 @@
+import pytest
+from services.gesture_state import GestureStateMachine
+
+
+def feed(machine, gestures, start=0.0, step=0.1):
+    return [machine.observe(gesture, now=start + i * step) for i, gesture in enumerate(gestures)]
+
+
+def test_gesture_commits_once_it_fills_the_hysteresis_window():
+    machine = GestureStateMachine(hysteresis_frames=3, debounce_ms=0)
+    assert feed(machine, ['LOOP', 'LOOP', 'LOOP']) == [None, None, 'LOOP']
+    assert machine.current == 'LOOP'
+
+
+def test_flicker_does_not_commit():
+    machine = GestureStateMachine(hysteresis_frames=3, debounce_ms=0)
+    assert feed(machine, ['LOOP', 'IF', 'LOOP', 'IF', 'LOOP']) == [None] * 5
+
+
+def test_held_gesture_commits_once():
+    machine = GestureStateMachine(hysteresis_frames=2, debounce_ms=0)
+    assert feed(machine, ['IF'] * 6).count('IF') == 1
+
+
+def test_release_allows_the_same_gesture_again():
+    machine = GestureStateMachine(hysteresis_frames=2, debounce_ms=0)
+    committed = feed(machine, ['IF', 'IF', None, None, 'IF', 'IF'])
+    assert committed == [None, 'IF', None, None, None, 'IF']
+
+
+def test_debounce_suppresses_commits_that_come_too_soon():
+    machine = GestureStateMachine(hysteresis_frames=1, debounce_ms=500)
+    assert machine.observe('LOOP', now=0.0) == 'LOOP'
+    assert machine.observe('IF', now=0.2) is None
+    assert machine.observe('IF', now=0.6) == 'IF'
+    assert machine.stats()['gesture_commits'] == 2
+
+
+def test_reset_forgets_the_held_gesture():
+    machine = GestureStateMachine(hysteresis_frames=2, debounce_ms=0)
+    feed(machine, ['LOOP', 'LOOP'])
+    machine.reset()
+    assert machine.last_observed is None
+    assert feed(machine, ['LOOP', 'LOOP'], start=1.0) == [None, 'LOOP']
+
+
+def test_hysteresis_must_be_positive():
+    with pytest.raises(ValueError):
+        GestureStateMachine(hysteresis_frames=0)
@@ -0,0 +1,108 @@
+import threading
+import time
+from services.hands_pool import HandsPool
+
+
+class FakeHands:
+    def __init__(self, static: bool = False):
+        self.static = static
+        self.resets = 0
+
+    def process(self, frame):
+        return 'static' if self.static else 'tracking'
+
+    def reset(self):
+        self.resets += 1
+
+    def close(self):
+        pass
+
+
+class State:
+    def __init__(self):
+        self.frames = 0
+
+    def reset(self):
+        self.frames = 0
+
+    def stats(self):
+        return {'frames': self.frames}
+
+
+def make_pool(max_size=2, factory=FakeHands, **kwargs):
+    return HandsPool(factory, max_size=max_size, min_idle=0, state_factory=State,
+                     static_factory=lambda: FakeHands(static=True), **kwargs)
+
+
+def test_session_keeps_its_instance():
+    pool = make_pool()
+    with pool.checkout('a') as first:
+        pass
+    with pool.checkout('a') as second:
+        pass
+    assert first is second
+    assert pool.stats()['checkouts'] == 1
+
+
+def test_full_pool_runs_extra_sessions_on_the_static_graph():
+    pool = make_pool(max_size=2)
+    bound = []
+    for session in ('a', 'b'):
+        with pool.checkout(session) as instance:
+            bound.append(instance)
+    with pool.checkout('c') as overflow:
+        assert overflow.process(None) == 'static'
+
+    # The bound sessions still hold their own graphs
+    for session, instance in zip(('a', 'b'), bound):
+        with pool.checkout(session) as again:
+            assert again is instance
+    assert all(instance.hands.resets == 0 for instance in bound)
+    assert pool.stats()['overflow_frames'] == 1
+
+
+def test_released_instance_goes_to_a_waiting_session():
+    pool = make_pool(max_size=1)
+    with pool.checkout('a') as first:
+        pass
+    pool.release('a')
+    with pool.checkout('b') as second:
+        assert second.process(None) == 'tracking'
+    assert second is first
+
+
+def test_concurrent_checkouts_with_slow_creation_never_fail():
+    def slow_factory():
+        time.sleep(0.05)
+        return FakeHands()
+
+    pool = make_pool(max_size=2, factory=slow_factory)
+    errors = []
+
+    def run(session):
+        try:
+            with pool.checkout(session) as instance:
+                instance.process(None)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(f's{i}',)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert pool.stats()['in_use'] == 2
+
+
+def test_session_state_is_kept_apart_from_the_graph():
+    pool = make_pool(max_size=1)
+    for session in ('a', 'b'):
+        pool.session_state(session).frames += 5
+        with pool.checkout(session):
+            pass
+    assert pool.session_state('a').frames == 5
+    assert pool.session_state('b').frames == 5
+
+    pool.release('a')
+    assert pool.session_state('a').frames == 0
@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from services.single_flight import SingleFlight, prompt_key
+
+
+def test_prompt_key_is_stable_and_order_independent_for_dicts():
+    assert prompt_key('model', [{'a': 1, 'b': 2}]) == prompt_key('model', [{'b': 2, 'a': 1}])
+    assert prompt_key('model', 'x') != prompt_key('model', 'y')
+
+
+def test_concurrent_callers_share_one_call():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 'code'
+
+    async def main():
+        flight = SingleFlight('test')
+        results = await asyncio.gather(*[flight.do('key', fetch) for _ in range(5)])
+        return flight, results
+
+    flight, results = asyncio.run(main())
+    assert results == ['code'] * 5
+    assert calls == 1
+    assert flight.stats() == {'in_flight': 0, 'calls': 1, 'coalesced': 4}
+
+
+def test_sequential_calls_are_not_coalesced():
+    async def fetch():
+        return 'code'
+
+    async def main():
+        flight = SingleFlight('test')
+        await flight.do('key', fetch)
+        await flight.do('key', fetch)
+        return flight
+
+    assert asyncio.run(main()).calls == 2
+
+
+def test_error_reaches_every_waiter():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError('upstream down')
+
+    async def main():
+        flight = SingleFlight('test')
+        return flight, await asyncio.gather(*[flight.do('key', fail) for _ in range(3)], return_exceptions=True)
+
+    flight, results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_cancelling_one_waiter_keeps_the_call_for_the_others():
+    async def main():
+        started = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            await asyncio.sleep(0.05)
+            return 'code'
+
+        flight = SingleFlight('test')
+        first = asyncio.create_task(flight.do('key', fetch))
+        second = asyncio.create_task(flight.do('key', fetch))
+        await started.wait()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == 'code'
+
+
+def test_cancelling_the_last_waiter_cancels_the_call():
+    async def main():
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        flight = SingleFlight('test')
+        waiter = asyncio.create_task(flight.do('key', fetch))
+        await started.wait()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        return flight
+
+    assert asyncio.run(main()).in_flight() == 0
@@ -9,8 +9,9 @@ from pathlib import Path
 class GestureModelTrainer:
     def __init__(self, data_dir: str = "data/gestures"):
         self.data_dir = Path(data_dir)
-        self.model = self._create_model()
+        # Classes must be known before building the model's output layer
         self.gesture_classes = self._load_gesture_mappings()
+        self.model = self._create_model()
         
     def _create_model(self):
         """Create a CNN model for gesture recognition"""
@@ -98,6 +99,45 @@ class GestureModelTrainer:
         # Save model
         self.model.save(self.data_dir / "gesture_model.h5")
 
+    def export_tflite(self, quantize: bool = False, num_calibration_samples: int = 100) -> Path:
+        """Export the trained model for the TFLite serving backend.
+
+        With ``quantize`` the model gets full-integer (int8) post-training
+        quantization, calibrated on images from the training data.
+        """
+        model = tf.keras.models.load_model(self.data_dir / "gesture_model.h5")
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        
+        if quantize:
+            samples = self._load_calibration_samples(num_calibration_samples)
+            
+            def representative_dataset():
+                for sample in samples:
+                    yield [sample.reshape(1, 64, 64, 1)]
+            
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.representative_dataset = representative_dataset
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            converter.inference_input_type = tf.int8
+            converter.inference_output_type = tf.int8
+        
+        output_path = self.data_dir / ("gesture_model_int8.tflite" if quantize else "gesture_model.tflite")
+        output_path.write_bytes(converter.convert())
+        return output_path
+
+    def _load_calibration_samples(self, num_samples: int) -> List[np.ndarray]:
+        """Load preprocessed training images for int8 calibration"""
+        # Spread the samples across every gesture directory
+        files = sorted(self.data_dir.glob("*/*.jpg"))
+        samples = []
+        for img_file in files[::max(1, len(files) // num_samples)][:num_samples]:
+            img = cv2.imread(str(img_file), cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                samples.append((cv2.resize(img, (64, 64)) / 255.0).astype(np.float32))
+        if not samples:
+            raise ValueError(f"No training images found in {self.data_dir} for calibration")
+        return samples
+
     def add_gesture_mapping(self, gesture_name: str, code_template: str):
         """Add a new gesture-to-code mapping"""
         self.gesture_classes[gesture_name] = len(self.gesture_classes)
@@ -8,6 +8,8 @@ import { BiGitBranch } from 'react-icons/bi';
 import { useAuth } from '../contexts/AuthContext';
 import { supabase } from '../config/supabaseClient';
 import GestureNotification from './GestureNotification';
+import { createWebSocketConnection } from '../utils/websocket';
+import { encodeBinaryFrame, captureFrameBlob } from '../utils/frameProtocol';
 
 function SignLanguageCoding() {
   const { user } = useAuth();
@@ -21,44 +23,204 @@ function SignLanguageCoding() {
   const [activeGesture, setActiveGesture] = useState(null);
   const [gestureHistory, setGestureHistory] = useState([]);
   const [isRecognizing, setIsRecognizing] = useState(false);
-  const [editorInstance, setEditorInstance] = useState(null);
-  const [cursorPosition, setCursorPosition] = useState({ lineNumber: 1, column: 1 });
   const [isGuideOpen, setIsGuideOpen] = useState(false);
 
   const webcamRef = useRef(null);
   const wsRef = useRef(null);
   const frameInterval = useRef(null);
+  const binaryModeRef = useRef(false);
+  const serverProtocolsRef = useRef([]);
+  const frameSequenceRef = useRef(0);
+  const latestGenerationRef = useRef(0);
+  const editorRef = useRef(null);
+  // Code streamed so far for the latest generation and where it starts in the editor
+  const streamRef = useRef(null);
+  // Capture rate and size, adjusted by the server's rate_control messages
+  const targetFpsRef = useRef(5);
+  const targetResolutionRef = useRef(null);
+
+  const addTerminalOutput = (message, type = 'info') => {
+    setTerminalOutput(prev => [...prev, {
+      id: Date.now() + Math.random(),
+      message,
+      type,
+      timestamp: new Date().toISOString()
+    }]);
+  };
+
+  // The socket is opened once per user, so it dispatches through a ref to the latest handler
+  const socketHandlerRef = useRef(null);
+  const handleSocketMessage = (data) => {
+    if (data.status === 'connected') {
+      serverProtocolsRef.current = data.protocols || [];
+      return;
+    }
+    if (data.protocol) {
+      binaryModeRef.current = data.protocol === 'binary';
+      return;
+    }
+    if (data.type === 'rate_control') {
+      targetFpsRef.current = data.target_fps;
+      targetResolutionRef.current = data.target_resolution;
+      if (frameInterval.current) {
+        startFrameLoop();
+      }
+      return;
+    }
+    if (data.type === 'code_delta') {
+      if (data.generation !== latestGenerationRef.current) {
+        return;
+      }
+      writeStreamedCode(data.generation, (streamRef.current?.text || '') + data.delta);
+      return;
+    }
+    if (data.type === 'code') {
+      // Code for a sequence that has since been superseded is discarded
+      if (data.generation !== latestGenerationRef.current) {
+        return;
+      }
+      const streamed = streamRef.current?.generation === data.generation;
+      if (data.status === 'error') {
+        discardStreamedCode();
+        addTerminalOutput(data.error, 'error');
+        return;
+      }
+      const gesture = {
+        name: data.gesture_name,
+        command: data.code,
+        confidence: data.confidence
+      };
+      if (streamed) {
+        // Replace the streamed draft with the final code instead of inserting it again
+        writeStreamedCode(data.generation, data.code);
+        streamRef.current = null;
+        saveGesture(gesture);
+        return;
+      }
+      onGestureDetected(gesture);
+      return;
+    }
+    if (data.status === 'error') {
+      addTerminalOutput(data.message || data.error, 'error');
+      return;
+    }
+    if (data.gesture_name && data.gesture_name !== 'NO_GESTURE') {
+      const gesture = {
+        name: data.gesture_name,
+        command: data.code || data.command,
+        confidence: data.confidence
+      };
+      setDetectedGesture(gesture);
+      if (data.code_status === 'pending') {
+        // The generated code arrives later in a "code" message for this generation;
+        // a draft still streaming for an older one will never be finished
+        discardStreamedCode();
+        latestGenerationRef.current = data.generation;
+        return;
+      }
+      onGestureDetected(gesture);
+    }
+  };
+
+  socketHandlerRef.current = handleSocketMessage;
+
+  useEffect(() => {
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const host = process.env.VITE_WS_HOST || window.location.host;
+    const ws = createWebSocketConnection(
+      `${protocol}//${host}/ws/sign-language/${user?.id || 'guest'}`,
+      {
+        onOpen: () => {
+          setIsConnected(true);
+          setIsLoading(false);
+        },
+        onMessage: (data) => socketHandlerRef.current(data),
+        onClose: () => {
+          setIsConnected(false);
+          binaryModeRef.current = false;
+        },
+        onError: () => setError('Connection to recognition service failed')
+      }
+    );
+    ws.binaryType = 'arraybuffer';
+    wsRef.current = ws;
+
+    return () => {
+      if (frameInterval.current) {
+        clearInterval(frameInterval.current);
+        frameInterval.current = null;
+      }
+      ws.close();
+    };
+  }, [user]);
 
   const handleEditorDidMount = (editor) => {
-    setEditorInstance(editor);
-    editor.onDidChangeCursorPosition((e) => {
-      setCursorPosition(e.position);
-    });
+    editorRef.current = editor;
   };
 
   const insertCodeAtCursor = (code) => {
-    if (!editorInstance) return;
+    // Read through the ref: this also runs from socket handlers created before the editor mounted
+    const editor = editorRef.current;
+    if (!editor) return;
 
+    const position = editor.getPosition();
     const id = { major: 1, minor: 1 };
     const op = {
       identifier: id,
       range: {
-        startLineNumber: cursorPosition.lineNumber,
-        startColumn: cursorPosition.column,
-        endLineNumber: cursorPosition.lineNumber,
-        endColumn: cursorPosition.column
+        startLineNumber: position.lineNumber,
+        startColumn: position.column,
+        endLineNumber: position.lineNumber,
+        endColumn: position.column
       },
       text: code,
       forceMoveMarkers: true
     };
 
-    editorInstance.executeEdits('gesture-input', [op]);
+    editor.executeEdits('gesture-input', [op]);
+  };
+
+  // Overwrite this generation's streamed code so far, starting it at the cursor on the first write
+  const writeStreamedCode = (generation, text) => {
+    const editor = editorRef.current;
+    if (!editor) return;
+
+    const model = editor.getModel();
+    let stream = streamRef.current;
+    if (!stream || stream.generation !== generation) {
+      stream = { generation, offset: model.getOffsetAt(editor.getPosition()), text: '' };
+    }
+    const start = model.getPositionAt(stream.offset);
+    const end = model.getPositionAt(stream.offset + stream.text.length);
+    editor.executeEdits('gesture-stream', [{
+      range: {
+        startLineNumber: start.lineNumber,
+        startColumn: start.column,
+        endLineNumber: end.lineNumber,
+        endColumn: end.column
+      },
+      text,
+      forceMoveMarkers: true
+    }]);
+    streamRef.current = { ...stream, text };
+  };
+
+  // Remove a partially streamed draft from the editor
+  const discardStreamedCode = () => {
+    const stream = streamRef.current;
+    if (stream) {
+      writeStreamedCode(stream.generation, '');
+      streamRef.current = null;
+    }
   };
 
   const onGestureDetected = async (gesture) => {
-    try {
-      insertCodeAtCursor(gesture.command);
+    insertCodeAtCursor(gesture.command);
+    await saveGesture(gesture);
+  };
 
+  const saveGesture = async (gesture) => {
+    try {
       const { error } = await supabase
         .from('gesture_history')
         .insert([{
@@ -91,6 +253,48 @@ function SignLanguageCoding() {
     }
   };
 
+  const sendFrame = async () => {
+    if (webcamRef.current && wsRef.current?.readyState === WebSocket.OPEN) {
+      const video = webcamRef.current.video;
+      const canvas = document.createElement('canvas');
+      // Downscale to the server's target resolution, never upscale
+      const target = targetResolutionRef.current;
+      const scale = target
+        ? Math.min(1, target.width / video.videoWidth, target.height / video.videoHeight)
+        : 1;
+      canvas.width = Math.round(video.videoWidth * scale);
+      canvas.height = Math.round(video.videoHeight * scale);
+      
+      const ctx = canvas.getContext('2d');
+      ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
+      
+      const sequence = frameSequenceRef.current++;
+      if (binaryModeRef.current) {
+        // Raw JPEG bytes with a small header, no base64 or JSON on either side
+        const blob = await captureFrameBlob(canvas);
+        if (!blob || wsRef.current?.readyState !== WebSocket.OPEN) return;
+        wsRef.current.send(await encodeBinaryFrame(blob, sequence, selectedLanguage));
+        return;
+      }
+
+      // Get base64 frame
+      const frame = canvas.toDataURL('image/jpeg', 0.5);
+      
+      wsRef.current.send(JSON.stringify({
+        frame,
+        sequence,
+        language: selectedLanguage
+      }));
+    }
+  };
+
+  const startFrameLoop = () => {
+    if (frameInterval.current) {
+      clearInterval(frameInterval.current);
+    }
+    frameInterval.current = setInterval(sendFrame, 1000 / targetFpsRef.current);
+  };
+
   const startRecognition = () => {
     if (!isConnected) {
       addTerminalOutput('Not connected to recognition service', 'error');
@@ -98,28 +302,14 @@ function SignLanguageCoding() {
     }
 
     setIsRecognizing(true);
-    wsRef.current.send(JSON.stringify({ type: 'start_recognition' }));
+    // Ask for raw binary frames when the server supports them; old servers keep JSON
+    wsRef.current.send(JSON.stringify({
+      type: 'start_recognition',
+      protocol: serverProtocolsRef.current.includes('binary') ? 'binary' : 'json'
+    }));
     
     // Start sending frames
-    frameInterval.current = setInterval(() => {
-      if (webcamRef.current && wsRef.current?.readyState === WebSocket.OPEN) {
-        const video = webcamRef.current.video;
-        const canvas = document.createElement('canvas');
-        canvas.width = video.videoWidth;
-        canvas.height = video.videoHeight;
-        
-        const ctx = canvas.getContext('2d');
-        ctx.drawImage(video, 0, 0);
-        
-        // Get base64 frame
-        const frame = canvas.toDataURL('image/jpeg', 0.5);
-        
-        wsRef.current.send(JSON.stringify({
-          frame,
-          language: selectedLanguage
-        }));
-      }
-    }, 200); // 5 frames per second
+    startFrameLoop();
 
     addTerminalOutput('Sign language recognition started', 'success');
   };
@@ -133,6 +323,9 @@ function SignLanguageCoding() {
     if (wsRef.current?.readyState === WebSocket.OPEN) {
       wsRef.current.send(JSON.stringify({ type: 'stop_recognition' }));
     }
+    // The server cancels pending code generation; drop its partial draft and ignore late messages for it
+    discardStreamedCode();
+    latestGenerationRef.current = null;
     addTerminalOutput('Sign language recognition stopped', 'info');
   };
 
@@ -0,0 +1,27 @@
+// Binary frame layout shared with backend/services/frame_protocol.py (big-endian):
+// version (uint8) | language id (uint8) | sequence (uint32) | timestamp ms (float64) | image bytes
+export const FRAME_PROTOCOL_VERSION = 1;
+export const FRAME_HEADER_SIZE = 14;
+
+export const LANGUAGE_IDS = {
+  javascript: 0,
+  python: 1,
+  java: 2
+};
+
+export const encodeBinaryFrame = async (blob, sequence, language) => {
+  const body = await blob.arrayBuffer();
+  const buffer = new ArrayBuffer(FRAME_HEADER_SIZE + body.byteLength);
+  const view = new DataView(buffer);
+
+  view.setUint8(0, FRAME_PROTOCOL_VERSION);
+  view.setUint8(1, LANGUAGE_IDS[language] ?? LANGUAGE_IDS.javascript);
+  view.setUint32(2, sequence >>> 0);
+  view.setFloat64(6, Date.now());
+  new Uint8Array(buffer, FRAME_HEADER_SIZE).set(new Uint8Array(body));
+
+  return buffer;
+};
+
+export const captureFrameBlob = (canvas, type = 'image/jpeg', quality = 0.5) =>
+  new Promise((resolve) => canvas.toBlob(resolve, type, quality));